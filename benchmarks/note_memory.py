@@ -0,0 +1,57 @@
+"""
+Reports the memory used per note by a generated score, so that regressions in the size of notes get caught.
+
+Usage:
+    $ python benchmarks/note_memory.py --notes 1000000 --max-bytes-per-note 200
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from composer.notes import Note, NoteValue, TimeSignature  # noqa: E402
+from composer.pitches import Pitch, KeySignature  # noqa: E402
+from composer.scales import ScaleMode  # noqa: E402
+
+
+def bytes_per_note(num_notes: int) -> float:
+    """
+    Measure the memory allocated per note while generating a score of random notes.
+    """
+    key_signature = KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR)
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+
+    def random_note():
+        return Note.random(key_signature=key_signature, time_signature=time_signature, bpm=80)
+
+    # warm up shared caches (scales, interned pitches) so only the memory held by each note is measured
+    random_note()
+
+    tracemalloc.start()
+    notes = [random_note() for _ in range(num_notes)]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    assert len(notes) == num_notes
+    return allocated / num_notes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--notes', type=int, default=1_000_000, help='number of notes in the score')
+    parser.add_argument('--max-bytes-per-note', type=float, default=None,
+                        help='fail if a note uses more memory than this')
+    args = parser.parse_args()
+
+    result = bytes_per_note(args.notes)
+    print(f"{args.notes} notes: {result:.1f} bytes/note")
+
+    if args.max_bytes_per_note is not None and result > args.max_bytes_per_note:
+        print(f"regression: more than {args.max_bytes_per_note} bytes/note", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
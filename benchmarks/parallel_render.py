@@ -0,0 +1,57 @@
+"""
+Compares the time to render a long melody serially and in parallel (see Tone.render_melody's processes), and checks
+that both renders are identical.
+
+Usage:
+    $ python benchmarks/parallel_render.py --minutes 30 --processes 16
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from composer.notes import Note  # noqa: E402
+from composer.pitches import Pitch, KeySignature  # noqa: E402
+from composer.scales import ScaleMode  # noqa: E402
+from composer.tone import Tone  # noqa: E402
+
+
+def random_melody(minutes: float, note_duration: float = 0.25):
+    """
+    Generate a melody of random notes in A major that lasts about the given number of minutes.
+    """
+    key_signature = KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR)
+    return [Note.random(key_signature=key_signature).pitch.frequency
+            for _ in range(int(minutes * 60 / note_duration))], note_duration
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--minutes', type=float, default=30, help='length of the melody')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='number of rendering processes')
+    args = parser.parse_args()
+
+    melody, note_duration = random_melody(args.minutes)
+
+    start = time.perf_counter()
+    serial = Tone.render_melody(melody, note_duration)
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parallel = Tone.render_melody(melody, note_duration, processes=args.processes)
+    parallel_seconds = time.perf_counter() - start
+
+    print(f"{args.minutes} minutes, {len(melody)} notes: serial {serial_seconds:.2f}s, "
+          f"{args.processes} processes {parallel_seconds:.2f}s ({serial_seconds / parallel_seconds:.1f}x)")
+
+    if not np.array_equal(serial, parallel):
+        print("parallel render differs from the serial render", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
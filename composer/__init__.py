@@ -3,8 +3,13 @@ from composer.intervals import *
 from composer.scales import *
 from composer.chords import *
 from composer.pitches import *
+from composer.scores import *
+from composer.midi import *
 from composer.tone import *
+from composer.timeline import *
+from composer.playback import *
 from composer.songs import *
+from composer.batch import *
 
 if __name__ == '__main__':
     print('Hello Composer :)')
@@ -0,0 +1,81 @@
+"""
+Command line entry point of the composer package.
+
+Usage:
+    $ python -m composer batch --songs 100 --modes major minor --roots 220 440 --bpms 80 120 --notes 8 16 \
+        --out-dir out/batch
+    $ python -m composer ambient --mode minor --root 220 --bpm 60
+"""
+import argparse
+import os
+import sys
+import time
+
+from .batch import job_grid, run_batch, MANIFEST_FILENAME
+from .scales import ScaleMode
+from .songs import ambient_song, AMBIENT_LATENCY
+
+
+def batch(args: argparse.Namespace):
+    jobs = job_grid(modes=[ScaleMode(mode) for mode in args.modes],
+                    root_frequencies=args.roots,
+                    bpms=args.bpms,
+                    note_counts=args.notes,
+                    songs_per_combination=args.songs,
+                    seed=args.seed)
+
+    start = time.perf_counter()
+    for idx, entry in enumerate(run_batch(jobs, args.out_dir, args.processes), start=1):
+        if not args.quiet:
+            print(f"[{idx}/{len(jobs)}] {entry['name']}: {entry['mode']} {entry['root_frequency']}Hz "
+                  f"{entry['bpm']}bpm {entry['num_notes']} notes")
+
+    print(f"Wrote {len(jobs)} songs to {args.out_dir} in {time.perf_counter() - start:.1f}s "
+          f"(manifest: {os.path.join(args.out_dir, MANIFEST_FILENAME)})")
+
+
+def ambient(args: argparse.Namespace):
+    try:
+        playback = ambient_song(mode=ScaleMode(args.mode), root_frequency=args.root, bpm=args.bpm,
+                                latency=args.latency, seconds=args.seconds)
+    except KeyboardInterrupt:
+        return
+
+    print(f"Played {playback.frames_played / playback.tone.sample_rate:.1f}s with {playback.underruns} underruns "
+          f"(max latency: {playback.max_latency:.3f}s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m composer', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    batch_parser = subparsers.add_parser('batch', help='generate and export many random songs in parallel')
+    batch_parser.add_argument('--songs', type=int, default=1, help='number of songs per combination of parameters')
+    batch_parser.add_argument('--modes', nargs='+', default=[ScaleMode.MAJOR.value],
+                              choices=[mode.value for mode in ScaleMode], help='scale modes of the songs')
+    batch_parser.add_argument('--roots', nargs='+', type=float, default=[440], help='root frequencies of the songs')
+    batch_parser.add_argument('--bpms', nargs='+', type=int, default=[80], help='tempos of the songs')
+    batch_parser.add_argument('--notes', nargs='+', type=int, default=[12], help='numbers of notes of the songs')
+    batch_parser.add_argument('--seed', type=int, default=0, help='seed of the first song (songs get consecutive seeds)')
+    batch_parser.add_argument('--processes', type=int, default=os.cpu_count(), help='number of worker processes')
+    batch_parser.add_argument('--out-dir', default=os.path.join('out', 'batch'), help='directory to write songs to')
+    batch_parser.add_argument('--quiet', action='store_true', help='only print a summary')
+    batch_parser.set_defaults(func=batch)
+
+    ambient_parser = subparsers.add_parser('ambient', help='play random notes endlessly')
+    ambient_parser.add_argument('--mode', default=ScaleMode.MAJOR.value, choices=[mode.value for mode in ScaleMode],
+                                help='scale mode of the notes')
+    ambient_parser.add_argument('--root', type=float, default=440, help='root frequency of the scale')
+    ambient_parser.add_argument('--bpm', type=int, default=80, help='tempo of the notes')
+    ambient_parser.add_argument('--latency', type=float, default=AMBIENT_LATENCY,
+                                help='longest time (in seconds) between generating a note and hearing it')
+    ambient_parser.add_argument('--seconds', type=float, default=None, help='stop after this long (default: never)')
+    ambient_parser.set_defaults(func=ambient)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,122 @@
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+
+DEFAULT_FRAME_SIZE = 1024
+
+# Half-width (in bins) of the part of the window spectrum that each partial is drawn with
+KERNEL_HALF_WIDTH = 4
+
+# Number of window spectrum samples per bin, between which the spectrum is linearly interpolated
+KERNEL_OVERSAMPLING = 64
+
+# Number of frames that overlap at every sample (i.e. frames advance by frame_size / FRAME_OVERLAP samples)
+FRAME_OVERLAP = 4
+
+
+def blackman_harris_window(size: int) -> np.ndarray:
+    """
+    A periodic 4-term Blackman-Harris window, whose spectrum is concentrated in +/- 4 bins.
+    """
+    n = np.arange(size) * (2.0 * np.pi / size)
+    return 0.35875 - 0.48829 * np.cos(n) + 0.14128 * np.cos(2 * n) - 0.01168 * np.cos(3 * n)
+
+
+@lru_cache(maxsize=8)
+def _window_kernel(frame_size: int):
+    """
+    Sample the spectrum of the frame window around its main lobe, and the gain that overlapping windowed frames
+    add up to at each sample of a hop (which the overlap-added output is divided by).
+
+    The window spectrum is stored with its linear phase removed (i.e. centered on the middle of the frame), which
+    leaves a smooth function that interpolates well.
+    """
+    window = blackman_harris_window(frame_size)
+
+    spectrum = np.fft.fft(window, frame_size * KERNEL_OVERSAMPLING)
+    offsets = np.arange(-KERNEL_HALF_WIDTH * KERNEL_OVERSAMPLING, KERNEL_HALF_WIDTH * KERNEL_OVERSAMPLING + 1)
+    kernel = spectrum[offsets] * np.exp(1j * np.pi * offsets / KERNEL_OVERSAMPLING)
+
+    overlap_gain = window.reshape(FRAME_OVERLAP, -1).sum(axis=0)
+
+    return kernel, overlap_gain
+
+
+def additive_wave(frequencies: Iterable[float],
+                  length: float,
+                  amplitudes: Iterable[float] = None,
+                  sample_rate: int = 44100,
+                  frame_size: int = DEFAULT_FRAME_SIZE) -> np.ndarray:
+    """
+    Synthesize a sum of sine partials in the frequency domain, with inverse FFT frames that are overlap-added.
+
+    Each partial only adds a few bins (the main lobe of the window spectrum) to each frame's spectrum, so the cost
+    is dominated by the inverse FFTs of the frames and barely grows with the number of partials.
+    Like the synthesizer's chords, partials start at phase zero and are mixed with equal weights by default.
+    """
+    frequencies = np.asarray(list(frequencies), dtype=float)
+    amplitudes = np.full(len(frequencies), 1 / len(frequencies)) if amplitudes is None \
+        else np.asarray(list(amplitudes), dtype=float)
+
+    size = int(sample_rate * float(length))
+    hop = frame_size // FRAME_OVERLAP
+    num_bins = frame_size // 2 + 1
+    kernel, overlap_gain = _window_kernel(frame_size)
+
+    # A real partial at (fractional) bin b has spectral images at -b and frame_size - b with the opposite phase,
+    # which matter for partials close to 0Hz or to the Nyquist frequency.
+    partial_bins = frequencies * frame_size / sample_rate
+    image_bins = np.concatenate([partial_bins, -partial_bins, frame_size - partial_bins])
+    image_signs = np.repeat([1.0, -1.0, -1.0], len(frequencies))
+    image_partials = np.tile(np.arange(len(frequencies)), 3)
+
+    # bins covered by the main lobe of each image
+    lobe_offsets = np.arange(-KERNEL_HALF_WIDTH + 1, KERNEL_HALF_WIDTH + 1)
+    lobe_bins = np.floor(image_bins)[:, np.newaxis].astype(np.int64) + lobe_offsets
+    distances = lobe_bins - image_bins[:, np.newaxis]
+
+    # window spectrum at each lobe bin (linearly interpolated), with the linear phase of the window restored
+    position = (distances + KERNEL_HALF_WIDTH) * KERNEL_OVERSAMPLING
+    lower = np.clip(np.floor(position).astype(np.int64), 0, len(kernel) - 2)
+    fraction = position - lower
+    lobe = (kernel[lower] * (1 - fraction) + kernel[lower + 1] * fraction) * np.exp(-1j * np.pi * distances)
+    lobe *= (0.5 * amplitudes[image_partials])[:, np.newaxis]
+
+    # only the bins of the one-sided spectrum are synthesized
+    in_spectrum = (lobe_bins >= 0) & (lobe_bins < num_bins)
+    lobe_images = np.broadcast_to(np.arange(len(image_bins))[:, np.newaxis], lobe_bins.shape)[in_spectrum]
+    lobe_bins = lobe_bins[in_spectrum]
+    lobe = lobe[in_spectrum]
+
+    # frame j starts at sample (j - FRAME_OVERLAP + 1) * hop, so that every sample is covered by FRAME_OVERLAP frames
+    lead = (FRAME_OVERLAP - 1) * hop
+    num_frames = -(-size // hop) + FRAME_OVERLAP - 1
+    frame_starts = np.arange(num_frames) * hop - lead
+
+    wave = np.zeros((num_frames + FRAME_OVERLAP - 1) * hop)
+    hops = wave.reshape(-1, hop)
+    frames_per_chunk = max(1, 2 ** 18 // frame_size)
+
+    for chunk_start in range(0, num_frames, frames_per_chunk):
+        chunk_starts = frame_starts[chunk_start:chunk_start + frames_per_chunk]
+        num_chunk_frames = len(chunk_starts)
+
+        # phase of each partial at the start of each frame, starting (like the synthesizer) one sample in.
+        # sin(x) = cos(x - pi/2)
+        phases = 2.0 * np.pi * np.outer(chunk_starts + 1, frequencies) / sample_rate - np.pi / 2
+        rotations = np.exp(1j * phases[:, image_partials] * image_signs)
+
+        contributions = rotations[:, lobe_images] * lobe
+        flat_bins = (np.arange(num_chunk_frames)[:, np.newaxis] * num_bins + lobe_bins).ravel()
+        spectra = np.bincount(flat_bins, contributions.real.ravel(), num_chunk_frames * num_bins) + \
+            1j * np.bincount(flat_bins, contributions.imag.ravel(), num_chunk_frames * num_bins)
+
+        frames = np.fft.irfft(spectra.reshape(num_chunk_frames, num_bins), frame_size, axis=1)
+
+        # overlap-add each hop-sized part of the frames
+        for part in range(FRAME_OVERLAP):
+            hops[chunk_start + part:chunk_start + part + num_chunk_frames] += frames[:, part * hop:(part + 1) * hop]
+
+    hops /= overlap_gain
+    return wave[lead:lead + size]
@@ -0,0 +1,98 @@
+import itertools
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, asdict
+from typing import List, Iterable, Iterator
+
+from .notes import Note, TimeSignature, NoteValue
+from .pitches import Pitch, KeySignature
+from .scales import ScaleMode
+from .tone import Tone, notes_with_lengths
+
+MANIFEST_FILENAME = "manifest.jsonl"
+
+# Number of jobs sent to a worker process at a time
+JOBS_PER_TASK = 8
+
+
+@dataclass(frozen=True)
+class BatchJob:
+    """
+    The parameters of one song of a batch. The seed makes the song reproducible, whichever worker generates it.
+    """
+    name: str
+    mode: ScaleMode
+    root_frequency: float
+    bpm: int
+    num_notes: int
+    seed: int
+
+    def to_dict(self) -> dict:
+        return {**asdict(self), 'mode': self.mode.value}
+
+
+def job_grid(modes: Iterable[ScaleMode] = (ScaleMode.MAJOR,),
+             root_frequencies: Iterable[float] = (440,),
+             bpms: Iterable[int] = (80,),
+             note_counts: Iterable[int] = (12,),
+             songs_per_combination: int = 1,
+             seed: int = 0) -> List[BatchJob]:
+    """
+    Get the jobs for songs_per_combination songs of every combination of the parameter grids. Jobs get consecutive
+    seeds starting at seed, so a batch is reproducible.
+    """
+    combinations = itertools.product(modes, root_frequencies, bpms, note_counts, range(songs_per_combination))
+    return [BatchJob(name=f"song-{idx:06d}", mode=mode, root_frequency=root_frequency, bpm=bpm,
+                     num_notes=num_notes, seed=seed + idx)
+            for idx, (mode, root_frequency, bpm, num_notes, _) in enumerate(combinations)]
+
+
+def generate_song(job: BatchJob) -> List[Note]:
+    """
+    Generate the random notes of a job's song (like songs.random_piece), from the job's seed.
+    """
+    random.seed(job.seed)
+    key_signature = KeySignature(pitch=Pitch(job.root_frequency), mode=job.mode)
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    return [Note.random(key_signature=key_signature, time_signature=time_signature, bpm=job.bpm)
+            for _ in range(job.num_notes)]
+
+
+def render_job(job: BatchJob, out_dir: str) -> dict:
+    """
+    Generate a job's song, and write its wav and midi files to out_dir. Returns the manifest entry of the song.
+    """
+    notes = generate_song(job)
+    wav_path = os.path.join(os.path.abspath(out_dir), f"{job.name}.wav")
+    midi_path = os.path.join(os.path.abspath(out_dir), f"{job.name}.mid")
+
+    Tone.write_wav_melody(wav_path, notes)
+    Tone.write_midi_melody(midi_path, notes)
+
+    return {**job.to_dict(),
+            'wav': os.path.basename(wav_path),
+            'midi': os.path.basename(midi_path),
+            'duration': sum(note.duration.value for note in notes),
+            'num_samples': sum(length for _, length in notes_with_lengths(notes))}
+
+
+def _render_jobs(jobs: List[BatchJob], out_dir: str) -> List[dict]:
+    return [render_job(job, out_dir) for job in jobs]
+
+
+def run_batch(jobs: List[BatchJob], out_dir: str, processes: int = None) -> Iterator[dict]:
+    """
+    Render jobs in a pool of processes, writing the wav and midi files of the songs to out_dir along with a manifest
+    (one JSON line per song, in job order). Yields manifest entries as songs are done.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    tasks = [jobs[start:start + JOBS_PER_TASK] for start in range(0, len(jobs), JOBS_PER_TASK)]
+
+    with open(os.path.join(out_dir, MANIFEST_FILENAME), 'w') as manifest, \
+            ProcessPoolExecutor(max_workers=processes) as executor:
+        for entries in executor.map(_render_jobs, tasks, itertools.repeat(out_dir)):
+            for entry in entries:
+                manifest.write(json.dumps(entry) + "\n")
+                yield entry
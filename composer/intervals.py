@@ -3,14 +3,27 @@ from typing import Union, List, Tuple
 
 class Interval:
     """TODO: extend built-in float?"""
+    __slots__ = ('value',)
 
     def __init__(self, value: float):
-        self.value = float(value)
-        self.inverse = float(1 / value)
+        object.__setattr__(self, 'value', float(value))
 
     def __repr__(self):
         return f'Interval<{self.value}>'
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return self.__class__, (self.value,)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    @property
+    def inverse(self) -> float:
+        return 1 / self.value
+
     def __eq__(self, other: object) -> bool:
         if isinstance(other, Interval):
             return self.value == other.value
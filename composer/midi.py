@@ -0,0 +1,445 @@
+import math
+import mmap
+import struct
+from array import array
+from typing import List, Tuple, BinaryIO, Generator, Optional
+
+import numpy as np
+
+from .notes import Note, Duration, TimeSignature, NoteValue, TempoMap, TICKS_PER_QUARTER
+from .pitches import Pitch, frequencies_from_midi_numbers
+from .scores import Track, Score, NOTE_DTYPE
+
+DEFAULT_BPM = 60  # quarter notes per minute
+
+# Tempo of a file without tempo events, as defined by the SMF specification
+DEFAULT_FILE_TEMPO = 500_000  # microseconds per quarter note, i.e. 120bpm
+
+# Number of note events encoded (and written) at a time
+EVENTS_PER_CHUNK = 2 ** 16
+
+NOTE_ON = 0x90
+META_EVENT = 0xFF
+META_TRACK_NAME = 0x03
+META_END_OF_TRACK = 0x2F
+META_TEMPO = 0x51
+META_TIME_SIGNATURE = 0x58
+
+# Channels of note tracks, by order: General MIDI plays channel 9 (the 10th) as percussion
+NOTE_CHANNELS = [channel for channel in range(16) if channel != 9]
+
+# Tempo maps of MIDI files count quarter notes
+DEFAULT_TEMPO_MAP = TempoMap.constant(DEFAULT_BPM)
+
+
+def encode_variable_length(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode non-negative integers (below 2 ** 28) as MIDI variable-length quantities: 7 bits per byte, most significant
+    first, with the top bit set on every byte but the last. Returns the bytes of each value in the columns of a
+    (num_values, 4) array, and the number of bytes of each.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for shift in (7, 14, 21):
+        lengths += values >= (1 << shift)
+
+    encoded = np.zeros((len(values), 4), dtype=np.uint8)
+    for idx in range(4):
+        # byte idx of a value holds its 7-bit group number (length - 1 - idx)
+        group = lengths - 1 - idx
+        present = group >= 0
+        continued = (group > 0).astype(np.int64) << 7
+        encoded[present, idx] = ((values[present] >> (7 * group[present])) & 0x7F) | continued[present]
+
+    return encoded, lengths
+
+
+def variable_length(value: int) -> bytes:
+    encoded, lengths = encode_variable_length(np.array([value]))
+    return encoded[0, :lengths[0]].tobytes()
+
+
+def ticks_from_seconds(times: np.ndarray,
+                       tempo_map: TempoMap = DEFAULT_TEMPO_MAP,
+                       ticks_per_quarter: int = TICKS_PER_QUARTER) -> np.ndarray:
+    """
+    Convert times (in seconds) to the nearest MIDI tick, following a tempo map (of quarter notes).
+    """
+    return np.rint(tempo_map.beats_from_seconds(times) * ticks_per_quarter).astype(np.int64)
+
+
+def quarter_note_tempo_map(tempo_map: TempoMap, time_signature: TimeSignature = None) -> TempoMap:
+    """
+    Convert a tempo map counting beats of a time signature to one counting (MIDI's) quarter notes.
+    """
+    scale = quarter_note_bpm(1, time_signature)
+    return TempoMap((beat * scale, bpm * scale) for beat, bpm in tempo_map)
+
+
+def note_events(track: Track,
+                tempo_map: TempoMap = DEFAULT_TEMPO_MAP,
+                ticks_per_quarter: int = TICKS_PER_QUARTER) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Get the note on/off events of a track ordered by tick, as (ticks, keys, velocities) with a velocity of 0 for note
+    offs. At the same tick, note offs come before note ons, so repeated notes are played again.
+    """
+    on_ticks = ticks_from_seconds(track.onsets, tempo_map, ticks_per_quarter)
+    off_ticks = ticks_from_seconds(track.onsets + track.durations, tempo_map, ticks_per_quarter)
+    off_ticks = np.maximum(off_ticks, on_ticks + 1)
+
+    keys = np.clip(np.rint(track.midi_numbers), 0, 127).astype(np.uint8)
+    velocities = np.clip(track.velocities, 1, 127).astype(np.uint8)
+
+    ticks = np.concatenate((off_ticks, on_ticks))
+    is_on = np.concatenate((np.zeros(len(track), dtype=bool), np.ones(len(track), dtype=bool)))
+    order = np.lexsort((is_on, ticks))
+
+    return ticks[order], np.concatenate((keys, keys))[order], \
+        np.concatenate((np.zeros(len(track), dtype=np.uint8), velocities))[order]
+
+
+def encode_note_events(deltas: np.ndarray, keys: np.ndarray, velocities: np.ndarray, channel: int = 0,
+                       running_status: bool = False) -> bytes:
+    """
+    Encode note events (delta ticks, keys and velocities) of a channel. Every event is a note on (note offs have a
+    velocity of 0), so with running status only the first event of a track needs a status byte.
+    """
+    encoded_deltas, delta_lengths = encode_variable_length(deltas)
+    has_status = np.zeros(len(deltas), dtype=np.int64)
+    if not running_status and len(deltas):
+        has_status[0] = 1
+
+    event_lengths = delta_lengths + has_status + 2
+    ends = np.cumsum(event_lengths)
+    starts = ends - event_lengths
+    data = np.empty(int(ends[-1]) if len(ends) else 0, dtype=np.uint8)
+
+    for idx in range(4):
+        present = delta_lengths > idx
+        data[starts[present] + idx] = encoded_deltas[present, idx]
+
+    positions = starts + delta_lengths
+    data[positions[has_status == 1]] = NOTE_ON | channel
+    positions += has_status
+    data[positions] = keys
+    data[positions + 1] = velocities
+
+    return data.tobytes()
+
+
+def _meta_event(delta: int, meta_type: int, data: bytes) -> bytes:
+    return variable_length(delta) + bytes([META_EVENT, meta_type]) + variable_length(len(data)) + data
+
+
+def tempo_event(delta: int, bpm: float) -> bytes:
+    return _meta_event(delta, META_TEMPO, struct.pack('>I', int(round(60_000_000 / bpm)))[1:])
+
+
+def time_signature_event(delta: int, time_signature: TimeSignature) -> bytes:
+    denominator = int(round(math.log2(1 / time_signature.beat_value)))
+    clocks_per_beat = int(round(96 * time_signature.beat_value))
+    return _meta_event(delta, META_TIME_SIGNATURE, bytes([time_signature.num_beats, denominator, clocks_per_beat, 8]))
+
+
+class _TrackChunk:
+    """
+    Writes a track chunk, whose length is patched in the header when it is closed (so the file must be seekable).
+    """
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+
+    def __enter__(self) -> BinaryIO:
+        self.file.write(b'MTrk\0\0\0\0')
+        self.start = self.file.tell()
+        return self.file
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.file.write(_meta_event(0, META_END_OF_TRACK, b''))
+        end = self.file.tell()
+        self.file.seek(self.start - 4)
+        self.file.write(struct.pack('>I', end - self.start))
+        self.file.seek(end)
+
+
+def write_midi_tracks(file_path: str,
+                      tracks: List[Track],
+                      tempo_map: TempoMap = DEFAULT_TEMPO_MAP,
+                      time_signature: TimeSignature = None,
+                      ticks_per_quarter: int = TICKS_PER_QUARTER):
+    """
+    Write tracks (with onsets and durations in seconds) to a format 1 Standard MIDI File. The first track of the file
+    holds the tempo map (of quarter notes) and time signature, and each track of notes (on NOTE_CHANNELS, by order)
+    follows it.
+
+    Events are encoded and written a chunk at a time, in one pass over each track.
+    """
+    with open(file_path, 'wb') as file:
+        file.write(b'MThd' + struct.pack('>IHHH', 6, 1, len(tracks) + 1, ticks_per_quarter))
+
+        with _TrackChunk(file):
+            if time_signature is not None:
+                file.write(time_signature_event(0, time_signature))
+
+            # the first tempo is in effect from the start
+            change_ticks = np.rint(np.array(tempo_map.beats) * ticks_per_quarter).astype(np.int64)
+            change_ticks[0] = 0
+            previous_tick = 0
+            for tick, bpm in zip(change_ticks.tolist(), tempo_map.bpms):
+                file.write(tempo_event(tick - previous_tick, bpm))
+                previous_tick = tick
+
+        for idx, track in enumerate(tracks):
+            with _TrackChunk(file):
+                if track.name:
+                    file.write(_meta_event(0, META_TRACK_NAME, track.name.encode()))
+
+                ticks, keys, velocities = note_events(track, tempo_map, ticks_per_quarter)
+                deltas = np.diff(ticks, prepend=0)
+                for start in range(0, len(ticks), EVENTS_PER_CHUNK):
+                    end = start + EVENTS_PER_CHUNK
+                    file.write(encode_note_events(deltas[start:end], keys[start:end], velocities[start:end],
+                                                  channel=NOTE_CHANNELS[idx % len(NOTE_CHANNELS)], running_status=start > 0))
+
+
+def write_midi_score(file_path: str, score: Score, ticks_per_quarter: int = TICKS_PER_QUARTER):
+    """
+    Write a score to a Standard MIDI File, with its tempo map (counted in beats of its time signature).
+    """
+    tempo_map = quarter_note_tempo_map(score.tempo_map, score.time_signature) if score.tempo_map else DEFAULT_TEMPO_MAP
+    write_midi_tracks(file_path, score.tracks, tempo_map, score.time_signature, ticks_per_quarter)
+
+
+def quarter_note_bpm(bpm: float, time_signature: TimeSignature = None) -> float:
+    """
+    Convert a tempo in beats (of a time signature) per minute to MIDI's quarter notes per minute.
+    """
+    beat_value = time_signature.beat_value if time_signature is not None else NoteValue.QUARTER
+    return bpm * beat_value / NoteValue.QUARTER
+
+
+def _read_variable_length(data, pos: int) -> Tuple[int, int]:
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, pos
+
+
+class MidiFile:
+    """
+    A Standard MIDI File for reading, memory-mapped and decoded lazily one track chunk at a time.
+
+    Note events of a track are decoded into arrays (with no object per event), and converted from ticks to seconds
+    with the tempo changes read so far (i.e. those of the first track of format 1 files, or of the track itself).
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._file = open(file_path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{file_path} is not a MIDI file")
+
+        if self._data[:4] != b'MThd':
+            self.close()
+            raise ValueError(f"{file_path} is not a MIDI file")
+
+        header_length, self.format, self.num_tracks, self.division = struct.unpack('>IHHH', self._data[4:14])
+        if self.division & 0x8000:
+            self.close()
+            raise ValueError(f"{file_path} uses SMPTE time division, which is not supported")
+
+        self.time_signature: Optional[TimeSignature] = None
+        self._chunks_start = 8 + header_length
+        self._tempo_changes = [(0, DEFAULT_FILE_TEMPO)]
+
+    def __repr__(self) -> str:
+        return f"MidiFile<{self.file_path},{self.format},{self.num_tracks}>"
+
+    def __enter__(self) -> 'MidiFile':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    @property
+    def tempo_map(self) -> TempoMap:
+        """
+        The tempo changes read so far, in quarter notes.
+        """
+        return TempoMap((tick / self.division, 60_000_000 / tempo) for tick, tempo in self._tempo_changes)
+
+    @property
+    def bpm(self) -> float:
+        """
+        The first tempo of the file, in quarter notes per minute.
+        """
+        return self.tempo_map.bpms[0]
+
+    def _track_chunks(self) -> Generator[Tuple[int, int], None, None]:
+        pos = self._chunks_start
+        while pos + 8 <= len(self._data):
+            chunk_type = self._data[pos:pos + 4]
+            length = struct.unpack('>I', self._data[pos + 4:pos + 8])[0]
+            pos += 8
+            if chunk_type == b'MTrk':
+                yield pos, min(pos + length, len(self._data))
+            pos += length
+
+    def _decode_track(self, start: int, end: int):
+        """
+        Decode the note events and meta events of a track chunk. Returns the track name, and the on and off ticks, keys
+        and velocities of its notes (in order of note on).
+        """
+        # read from a view of the mapped file, without copying the chunk (the views are released, so that the file can
+        # be closed)
+        view = memoryview(self._data)
+        data = view[start:end]
+        on_ticks, off_ticks, keys, velocities = array('q'), array('q'), array('B'), array('B')
+        add_on_tick, add_off_tick, add_key, add_velocity = \
+            on_ticks.append, off_ticks.append, keys.append, velocities.append
+        sounding = {}  # notes started on each channel and key, which are ended first in first out
+        name = None
+
+        tick = 0
+        status = 0
+        pos = 0
+        end = len(data)
+        try:
+            while pos < end:
+                byte = data[pos]
+                pos += 1
+                if byte & 0x80:
+                    delta = byte & 0x7F
+                    while byte & 0x80:
+                        byte = data[pos]
+                        pos += 1
+                        delta = (delta << 7) | (byte & 0x7F)
+                    tick += delta
+                else:
+                    tick += byte
+
+                byte = data[pos]
+                if byte & 0x80:
+                    pos += 1
+                    if byte == META_EVENT:
+                        meta_type = data[pos]
+                        length, pos = _read_variable_length(data, pos + 1)
+                        if meta_type == META_END_OF_TRACK:
+                            break
+                        elif meta_type == META_TEMPO:
+                            self._tempo_changes.append((tick, int.from_bytes(data[pos:pos + 3], 'big')))
+                        elif meta_type == META_TRACK_NAME:
+                            name = bytes(data[pos:pos + length]).decode('latin-1')
+                        elif meta_type == META_TIME_SIGNATURE and self.time_signature is None:
+                            self.time_signature = TimeSignature(data[pos], 1 / 2 ** data[pos + 1])
+                        pos += length
+                        continue
+                    elif byte == 0xF0 or byte == 0xF7:
+                        length, pos = _read_variable_length(data, pos)
+                        pos += length
+                        continue
+                    status = byte
+
+                kind = status & 0xF0
+                if kind == NOTE_ON or kind == 0x80:
+                    key = data[pos]
+                    velocity = data[pos + 1]
+                    pos += 2
+                    channel_key = (status & 0x0F) << 7 | key
+                    if kind == NOTE_ON and velocity:
+                        started = sounding.get(channel_key)
+                        if started is None:
+                            sounding[channel_key] = [len(on_ticks)]
+                        else:
+                            started.append(len(on_ticks))
+                        add_on_tick(tick)
+                        add_off_tick(-1)
+                        add_key(key)
+                        add_velocity(velocity)
+                    else:
+                        started = sounding.get(channel_key)
+                        if started:
+                            off_ticks[started.pop(0)] = tick
+                elif kind == 0xC0 or kind == 0xD0:
+                    pos += 1
+                else:
+                    pos += 2
+        finally:
+            data.release()
+            view.release()
+
+        off_ticks = np.frombuffer(off_ticks, dtype=np.int64).copy() if off_ticks else np.empty(0, dtype=np.int64)
+        off_ticks[off_ticks < 0] = tick  # notes still sounding at the end of the track
+        return name, np.frombuffer(on_ticks, dtype=np.int64) if on_ticks else np.empty(0, dtype=np.int64), \
+            off_ticks, np.frombuffer(keys, dtype=np.uint8), np.frombuffer(velocities, dtype=np.uint8)
+
+    def seconds_from_ticks(self, ticks: np.ndarray) -> np.ndarray:
+        """
+        Convert ticks to seconds, following the tempo changes read so far.
+        """
+        return self.tempo_map.seconds_from_beats(np.asarray(ticks) / self.division)
+
+    def tracks(self) -> Generator[Track, None, None]:
+        """
+        Decode the tracks with notes, one at a time, into columnar tracks (with onsets and durations in seconds).
+        """
+        for start, end in self._track_chunks():
+            name, on_ticks, off_ticks, keys, velocities = self._decode_track(start, end)
+            if not len(on_ticks):
+                continue
+
+            notes = np.empty(len(on_ticks), dtype=NOTE_DTYPE)
+            notes['onset'] = self.seconds_from_ticks(on_ticks)
+            notes['duration'] = self.seconds_from_ticks(off_ticks) - notes['onset']
+            notes['midi_number'] = keys
+            notes['frequency'] = frequencies_from_midi_numbers(keys)
+            notes['velocity'] = velocities
+            yield Track(notes, name=name, capacity=len(notes))
+
+    def notes(self) -> Generator[Note, None, None]:
+        """
+        Decode the notes of every track, one track after another (in order of onset within a track).
+        """
+        for track in self.tracks():
+            for midi_number, duration in zip(track.midi_numbers.astype(int).tolist(), track.durations.tolist()):
+                yield Note(pitch=Pitch(midi_number=midi_number), duration=Duration(duration))
+
+    def score(self) -> Score:
+        """
+        Decode every track into a score, with the file's tempo map (counted in beats of its time signature).
+        """
+        tracks = list(self.tracks())
+        scale = 1 / quarter_note_bpm(1, self.time_signature)
+        tempo_map = TempoMap((beat * scale, bpm * scale) for beat, bpm in self.tempo_map)
+        return Score(tracks, bpm=tempo_map.bpms[0], time_signature=self.time_signature, tempo_map=tempo_map)
+
+
+def read_midi_tracks(file_path: str) -> Generator[Track, None, None]:
+    """
+    Read the tracks of a MIDI file lazily, into columnar tracks.
+    """
+    with MidiFile(file_path) as midi_file:
+        yield from midi_file.tracks()
+
+
+def read_midi_notes(file_path: str) -> Generator[Note, None, None]:
+    """
+    Read the notes of a MIDI file lazily, as Note objects.
+    """
+    with MidiFile(file_path) as midi_file:
+        yield from midi_file.notes()
+
+
+def read_midi_score(file_path: str) -> Score:
+    with MidiFile(file_path) as midi_file:
+        return midi_file.score()
@@ -1,10 +1,20 @@
 import copy
 import math
 import random
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, Tuple, List
+
+import numpy as np
 
 from .pitches import Pitch, PitchClass, KeySignature
 from .utils import random_element
 
+# Resolution of the integer timebase of note values: every standard note value (down to a 256th, dotted or in triplets)
+# is a whole number of ticks
+TICKS_PER_QUARTER = 960
+TICKS_PER_WHOLE = 4 * TICKS_PER_QUARTER
+
 
 class NoteValue:
     WHOLE = 1
@@ -21,6 +31,10 @@ class NoteValue:
     def __repr__(self) -> str:
         return f"NoteValue<{self.value}>"
 
+    @property
+    def ticks(self) -> int:
+        return ticks_from_note_value(self.value)
+
     def dot(self, count: int = 1):
         multiplier = sum([2 ** -i for i in range(0, count + 1)])
         return NoteValue(multiplier * self.value)
@@ -50,13 +64,73 @@ class NoteValue:
 
 
 class TimeSignature:
+    __slots__ = ('num_beats', 'beat_value')
+
     def __init__(self, num_beats: int, note_value: float):
-        self.num_beats = num_beats
-        self.beat_value = note_value
+        object.__setattr__(self, 'num_beats', num_beats)
+        object.__setattr__(self, 'beat_value', note_value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return self.__class__, (self.num_beats, self.beat_value)
 
     def __repr__(self) -> str:
         return f"TimeSignature<{self.num_beats},{self.beat_value}>"
 
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TimeSignature) and \
+            (self.num_beats, self.beat_value) == (other.num_beats, other.beat_value)
+
+    def __hash__(self) -> int:
+        return hash((self.num_beats, self.beat_value))
+
+    @property
+    def ticks_per_beat(self) -> int:
+        return ticks_from_note_value(self.beat_value)
+
+    @property
+    def ticks_per_bar(self) -> int:
+        return self.num_beats * self.ticks_per_beat
+
+
+def ticks_from_note_value(note_value: float) -> int:
+    """
+    Get the (nearest) number of ticks in a note value.
+    """
+    return round(note_value * TICKS_PER_WHOLE)
+
+
+def seconds_from_ticks(ticks, bpm: float, beat_value: float):
+    """
+    Convert ticks (an int or an array of them) to seconds, at a tempo of bpm beats of beat_value per minute.
+    """
+    return ticks * 60 / (bpm * ticks_from_note_value(beat_value))
+
+
+def samples_from_ticks(ticks, bpm: float, beat_value: float, sample_rate: int) -> np.ndarray:
+    """
+    Convert ticks (e.g. onsets) to the nearest sample, at a tempo of bpm beats of beat_value per minute. With a whole
+    number bpm, the conversion is exact integer arithmetic, so samples never drift from ticks.
+    """
+    ticks = np.asarray(ticks, dtype=np.int64)
+    if float(bpm).is_integer():
+        numerators = ticks * (60 * sample_rate)
+        denominator = int(bpm) * ticks_from_note_value(beat_value)
+        return (2 * numerators + denominator) // (2 * denominator)
+    return np.rint(seconds_from_ticks(ticks, bpm, beat_value) * sample_rate).astype(np.int64)
+
+
+def onset_ticks(ticks: Iterable[int]) -> np.ndarray:
+    """
+    Get the onset (in ticks) of each of consecutive durations (in ticks), starting at 0.
+    """
+    ticks = np.asarray(ticks, dtype=np.int64)
+    onsets = np.zeros(len(ticks), dtype=np.int64)
+    np.cumsum(ticks[:-1], out=onsets[1:])
+    return onsets
+
 
 def duration_from_note_value(note_value: float,
                              bpm: float,
@@ -73,10 +147,116 @@ def note_value_from_duration(duration: float,
     return beat_duration * beat_value * duration
 
 
-def viable_durations_generator(bpm: float,
-                               time_signature: TimeSignature,
-                               max_duration: float = math.inf,
-                               max_note_value: float = None):
+class TempoMap:
+    """
+    The tempo changes of a piece, as (beat, bpm) pairs ordered by beat, with the time (in seconds) at which each
+    change happens precomputed. Converting between beats and seconds is then a binary search for the tempo in effect,
+    with vectorized forms for arrays of beats or times.
+
+    A change to the tempo already in effect is dropped. Before the first change, the tempo is that of the first change.
+    """
+
+    def __init__(self, changes: Iterable[Tuple[float, float]] = ((0, 60),)):
+        beats: List[float] = []
+        bpms: List[float] = []
+        for beat, bpm in sorted(((float(beat), float(bpm)) for beat, bpm in changes), key=lambda change: change[0]):
+            if bpm <= 0:
+                raise ValueError(f"tempo must be positive: {bpm}")
+            if beats and beat == beats[-1]:
+                bpms[-1] = bpm
+            elif not bpms or bpm != bpms[-1]:
+                beats.append(beat)
+                bpms.append(bpm)
+        if not beats:
+            raise ValueError("a tempo map needs at least one tempo")
+
+        self.beats = beats
+        self.bpms = bpms
+        self.seconds = [0.0] * len(beats)
+        self.seconds[0] = beats[0] * 60 / bpms[0]
+        for idx in range(1, len(beats)):
+            self.seconds[idx] = self.seconds[idx - 1] + (beats[idx] - beats[idx - 1]) * 60 / bpms[idx - 1]
+
+        self._beats = np.array(beats)
+        self._seconds = np.array(self.seconds)
+        self._seconds_per_beat = 60 / np.array(bpms)
+
+    def __repr__(self) -> str:
+        return f"TempoMap<{len(self)},{self.bpms[0]}>"
+
+    def __len__(self) -> int:
+        return len(self.beats)
+
+    def __iter__(self):
+        return iter(zip(self.beats, self.bpms))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, TempoMap) and self.beats == other.beats and self.bpms == other.bpms
+
+    @staticmethod
+    def constant(bpm: float) -> 'TempoMap':
+        return TempoMap([(0, bpm)])
+
+    @staticmethod
+    def from_seconds(changes: Iterable[Tuple[float, float]]) -> 'TempoMap':
+        """
+        Create a tempo map from tempo changes at times (in seconds) rather than beats.
+        """
+        changes = sorted(((float(time), float(bpm)) for time, bpm in changes), key=lambda change: change[0])
+        beat_changes = []
+        for idx, (time, bpm) in enumerate(changes):
+            beat = time * bpm / 60 if idx == 0 \
+                else beat_changes[-1][0] + (time - changes[idx - 1][0]) * changes[idx - 1][1] / 60
+            beat_changes.append((beat, bpm))
+        return TempoMap(beat_changes)
+
+    def _change_at_beat(self, beat: float) -> int:
+        return max(bisect_right(self.beats, beat) - 1, 0)
+
+    def bpm_at(self, beat: float) -> float:
+        return self.bpms[self._change_at_beat(beat)]
+
+    def seconds_at(self, beat: float) -> float:
+        """
+        Get the time (in seconds) of a beat.
+        """
+        idx = self._change_at_beat(beat)
+        return self.seconds[idx] + (beat - self.beats[idx]) * 60 / self.bpms[idx]
+
+    def beat_at(self, seconds: float) -> float:
+        """
+        Get the beat at a time (in seconds).
+        """
+        idx = max(bisect_right(self.seconds, seconds) - 1, 0)
+        return self.beats[idx] + (seconds - self.seconds[idx]) * self.bpms[idx] / 60
+
+    def duration(self, start_beat: float, num_beats: float) -> float:
+        """
+        Get the duration (in seconds) of a number of beats from a beat.
+        """
+        return self.seconds_at(start_beat + num_beats) - self.seconds_at(start_beat)
+
+    def seconds_from_beats(self, beats: np.ndarray) -> np.ndarray:
+        """
+        Vectorized seconds_at.
+        """
+        beats = np.asarray(beats, dtype=float)
+        idx = np.clip(np.searchsorted(self._beats, beats, side='right') - 1, 0, None)
+        return self._seconds[idx] + (beats - self._beats[idx]) * self._seconds_per_beat[idx]
+
+    def beats_from_seconds(self, seconds: np.ndarray) -> np.ndarray:
+        """
+        Vectorized beat_at.
+        """
+        seconds = np.asarray(seconds, dtype=float)
+        idx = np.clip(np.searchsorted(self._seconds, seconds, side='right') - 1, 0, None)
+        return self._beats[idx] + (seconds - self._seconds[idx]) / self._seconds_per_beat[idx]
+
+
+def viable_note_values_generator(bpm: float,
+                                 time_signature: TimeSignature,
+                                 max_duration: float = math.inf,
+                                 max_note_value: float = None):
     max_duration = duration_from_note_value(max_note_value, bpm, time_signature.beat_value) \
         if max_note_value else max_duration
 
@@ -89,26 +269,84 @@ def viable_durations_generator(bpm: float,
     for note_value in sorted(note_values):
         duration = duration_from_note_value(note_value, bpm, time_signature.beat_value)
         if (not max_duration) or duration <= max_duration:
-            yield duration
+            yield note_value
+
+
+def viable_durations_generator(bpm: float,
+                               time_signature: TimeSignature,
+                               max_duration: float = math.inf,
+                               max_note_value: float = None):
+    for note_value in viable_note_values_generator(bpm, time_signature, max_duration, max_note_value):
+        yield duration_from_note_value(note_value, bpm, time_signature.beat_value)
+
+
+@lru_cache(maxsize=256)
+def note_value_table(bpm: float,
+                     time_signature: TimeSignature,
+                     max_duration: float = math.inf,
+                     max_note_value: float = None) -> Tuple[float, ...]:
+    """
+    Get the viable note values (see viable_note_values_generator), built once per (bpm, time signature, maximum).
+    """
+    return tuple(viable_note_values_generator(bpm, time_signature, max_duration, max_note_value))
+
+
+@lru_cache(maxsize=256)
+def duration_table(bpm: float,
+                   time_signature: TimeSignature,
+                   max_duration: float = math.inf,
+                   max_note_value: float = None) -> np.ndarray:
+    """
+    Get the (read-only) durations in seconds of the viable note values, built once per (bpm, time signature, maximum).
+    """
+    durations = np.array([duration_from_note_value(note_value, bpm, time_signature.beat_value)
+                          for note_value in note_value_table(bpm, time_signature, max_duration, max_note_value)])
+    durations.flags.writeable = False
+    return durations
 
 
 class Duration:
+    """
+    A length of time, in seconds (value). A duration defined by a note value (or a number of ticks) at a tempo also
+    has an exact length in ticks, for timing that doesn't accumulate rounding errors.
+    """
+    __slots__ = ('value', 'note_value', 'bpm', 'time_signature', 'ticks')
+
     def __init__(self,
                  seconds: float = None,
                  note_value: float = None,
                  bpm: int = None, # reconsider defaults. Maybe we want a default time signature too?
-                 time_signature: TimeSignature = None):
-
-        self.bpm = bpm
-        self.time_signature = time_signature
-        self.seconds = seconds
-        self.note_value = note_value
-        self.value = None
+                 time_signature: TimeSignature = None,
+                 ticks: int = None):
 
         if seconds is not None:
-            self.value = seconds
+            value = seconds
+        elif ticks is not None:
+            ticks = int(ticks)
+            note_value = ticks / TICKS_PER_WHOLE
+            value = seconds_from_ticks(ticks, bpm, time_signature.beat_value)
         else:
-            self.value = duration_from_note_value(note_value, bpm, time_signature.beat_value)
+            ticks = ticks_from_note_value(note_value)
+            value = duration_from_note_value(note_value, bpm, time_signature.beat_value)
+
+        object.__setattr__(self, 'value', value)
+        object.__setattr__(self, 'note_value', note_value)
+        object.__setattr__(self, 'bpm', bpm)
+        object.__setattr__(self, 'time_signature', time_signature)
+        object.__setattr__(self, 'ticks', ticks)
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self):
+        return self.__class__, (self.value, self.note_value, self.bpm, self.time_signature, self.ticks)
+
+    @property
+    def seconds(self):
+        """
+        The duration in seconds, if it was not defined by a note value.
+        """
+        return self.value if self.note_value is None else None
 
     def __repr__(self) -> str:
         return f"Duration<{self.value}>"
@@ -124,17 +362,49 @@ class Duration:
         division of the beat or bpm. Consider time signature??
         """
         if bpm and time_signature:
-            durations = list(viable_durations_generator(bpm, time_signature, max_duration, max_note_value))
+            durations = _viable_durations(bpm, time_signature, max_duration, max_note_value)
             # TODO: weighted random. Weight notes in the middle more compared to whole notes and really fast notes.
             #   esp depending on the BPM.
-            return Duration(random_element(durations))
+            return random_element(durations)
         else:
             duration = random.random() * factor
 
         return Duration(duration)
 
+    @staticmethod
+    def random_batch(size: int,
+                     factor: float = 1,
+                     bpm: int = None,
+                     time_signature: TimeSignature = None,
+                     max_duration: float = None,
+                     max_note_value: float = None,
+                     random_state: np.random.RandomState = None) -> np.ndarray:
+        """
+        Draw many random durations (in seconds, as by Duration.random) at once, with one vectorized draw.
+        """
+        random_state = random_state if random_state is not None else np.random
+        if bpm and time_signature:
+            durations = duration_table(bpm, time_signature, max_duration, max_note_value)
+            return durations[random_state.randint(0, len(durations), size)]
+
+        return random_state.random_sample(size) * factor
+
+
+@lru_cache(maxsize=256)
+def _viable_durations(bpm: float,
+                      time_signature: TimeSignature,
+                      max_duration: float = math.inf,
+                      max_note_value: float = None) -> Tuple[Duration, ...]:
+    """
+    Get a (shared, immutable) Duration of each viable note value, so random notes don't each hold their own.
+    """
+    return tuple(Duration(note_value=note_value, bpm=bpm, time_signature=time_signature)
+                 for note_value in note_value_table(bpm, time_signature, max_duration, max_note_value))
+
 
 class Note:
+    __slots__ = ('pitch', 'duration')
+
     def __init__(self, pitch: Pitch = None, duration: Duration = None):
         self.pitch = pitch
         self.duration = duration
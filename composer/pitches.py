@@ -1,10 +1,14 @@
-import copy
 import math
 import random
-from dataclasses import dataclass
-from typing import Union, Generator, Tuple, List
+import re
+import weakref
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from typing import Union, Generator, Tuple, List, Iterable
 
-from .intervals import EqualTemperament12
+import numpy as np
+
+from .intervals import EqualTemperament12, Temperament
 from .scales import ScaleFactory, ScaleMode
 from .utils import next_wrap, prev_wrap, random_element
 
@@ -106,55 +110,61 @@ class PitchClass:
         return prev_wrap(current, pitch_classes)
 
 
-@dataclass
+@dataclass(init=False)
 class PitchInfo:
-    frequency: float = None
-    pitch_class: str = None
-    accidental: str = None
-    register: int = None
-    enharmonic_pitch_class: str = None
-    enharmonic_accidental: str = None
-    midi_number: float = None
+    # fields are declared without defaults (and defaulted in __init__) so that they can be stored in slots
+    __slots__ = ('frequency', 'pitch_class', 'accidental', 'register', 'enharmonic_pitch_class',
+                 'enharmonic_accidental', 'midi_number')
+
+    frequency: float
+    pitch_class: str
+    accidental: str
+    register: int
+    enharmonic_pitch_class: str
+    enharmonic_accidental: str
+    midi_number: float
+
+    def __init__(self,
+                 frequency: float = None,
+                 pitch_class: str = None,
+                 accidental: str = None,
+                 register: int = None,
+                 enharmonic_pitch_class: str = None,
+                 enharmonic_accidental: str = None,
+                 midi_number: float = None):
+        self.frequency = frequency
+        self.pitch_class = pitch_class
+        self.accidental = accidental
+        self.register = register
+        self.enharmonic_pitch_class = enharmonic_pitch_class
+        self.enharmonic_accidental = enharmonic_accidental
+        self.midi_number = midi_number
 
     def next(self):
         """
         Get the next pitch after the current one.
         """
-        pitch_info = copy.deepcopy(self)
-        pitch_info.frequency = None
-
-        if pitch_info.accidental == Accidental.FLAT:
-            pitch_info.swap_enharmonic()
-
-        if pitch_info.pitch_class in PitchClass.sharp():
-            pitch_info.accidental = Accidental.next(pitch_info.accidental)
-
-        if pitch_info.accidental == Accidental.NATURAL:
-            pitch_info.pitch_class = PitchClass.next(pitch_info.pitch_class)
-
-        if pitch_info.pitch_class == PitchClass.C and pitch_info.accidental == Accidental.NATURAL:
-            pitch_info.register = pitch_info.register + 1
-
-        return pitch_info
+        return self.transpose(1)
 
     def prev(self):
         """
         Get the pitch info before the current pitch.
         """
-        pitch_info = copy.deepcopy(self)
-        pitch_info.frequency = None
+        return self.transpose(-1)
 
-        if pitch_info.accidental == Accidental.SHARP:
-            pitch_info.swap_enharmonic()
-
-        if pitch_info.pitch_class in PitchClass.flat():
-            pitch_info.accidental = Accidental.prev(pitch_info.accidental)
-
-        if pitch_info.accidental == Accidental.NATURAL:
-            pitch_info.pitch_class = PitchClass.prev(pitch_info.pitch_class)
+    def transpose(self, semitones: int):
+        """
+        Get the pitch info a number of semitones away from the current one. Pitches reached by going up are spelled
+        with sharps, and pitches reached by going down are spelled with flats (a pitch keeps its spelling when it isn't
+        transposed).
+        """
+        register = self.register if self.register is not None else 0
+        semitone = semitone_from_pitch_info(self, register) + semitones
+        flat = semitones < 0 or (semitones == 0 and self.accidental == Accidental.FLAT)
+        pitch_info = pitch_info_from_semitone(semitone, flat=flat)
 
-        if pitch_info.pitch_class == PitchClass.B and pitch_info.accidental == Accidental.NATURAL:
-            pitch_info.register = pitch_info.register - 1
+        if self.register is None:
+            pitch_info.register = None
 
         return pitch_info
 
@@ -186,7 +196,7 @@ class PitchInfo:
         self.pitch_class, self.enharmonic_pitch_class = self.enharmonic_pitch_class, self.pitch_class
         self.accidental, self.enharmonic_accidental = self.enharmonic_accidental, self.accidental
 
-    def to_pitch(self):
+    def to_pitch(self, temperament: Temperament = EqualTemperament12):
         """
         Transform the pitch info into a (complete) pitch.
         """
@@ -195,7 +205,8 @@ class PitchInfo:
                      accidental=self.accidental,
                      register=self.register,
                      enharmonic_pitch_class=self.enharmonic_pitch_class,
-                     enharmonic_accidental=self.enharmonic_accidental)
+                     enharmonic_accidental=self.enharmonic_accidental,
+                     temperament=temperament)
 
 
 # List of chromatic pitches in the western music system.
@@ -276,6 +287,63 @@ CHROMATIC_PITCHES_INFO = [
 ]
 
 
+# Reference pitch that all frequencies and midi numbers are tuned against, i.e. Pitch<A,natural,4>
+REFERENCE_PITCH_INFO, REFERENCE_PITCH_IDX = next(
+    (pitch_info, idx) for idx, pitch_info in enumerate(CHROMATIC_PITCHES_INFO)
+    if pitch_info.frequency and pitch_info.midi_number is not None)
+
+SEMITONES_PER_OCTAVE = len(CHROMATIC_PITCHES_INFO)
+
+# Semitones of each pitch class and accidental above C, in the register of the pitch
+PITCH_CLASS_SEMITONES = {PitchClass.C: 0, PitchClass.D: 2, PitchClass.E: 4, PitchClass.F: 5,
+                         PitchClass.G: 7, PitchClass.A: 9, PitchClass.B: 11}
+ACCIDENTAL_SEMITONES = {Accidental.FLAT: -1, Accidental.NATURAL: 0, Accidental.SHARP: 1}
+
+
+def _spelling_table(flat: bool) -> Tuple[PitchInfo, ...]:
+    """
+    Build the spelling of each semitone above C (without register) from the chromatic pitches.
+    """
+    table = [None] * SEMITONES_PER_OCTAVE
+    for chromatic_pitch_info in CHROMATIC_PITCHES_INFO:
+        pitch_info = PitchInfo(pitch_class=chromatic_pitch_info.pitch_class,
+                               accidental=chromatic_pitch_info.accidental,
+                               enharmonic_pitch_class=chromatic_pitch_info.enharmonic_pitch_class,
+                               enharmonic_accidental=chromatic_pitch_info.enharmonic_accidental)
+        if flat and pitch_info.enharmonic_pitch_class:
+            pitch_info.swap_enharmonic()
+
+        table[semitone_from_pitch_info(pitch_info, register=-1)] = pitch_info
+    return tuple(table)
+
+
+def semitone_from_pitch_info(pitch_info: PitchInfo, register: int = None) -> int:
+    """
+    Get the absolute semitone index (i.e. the 12-tone equal temperament midi number) of a spelled pitch.
+    """
+    register = pitch_info.register if register is None else register
+    return (SEMITONES_PER_OCTAVE * (register + 1) +
+            PITCH_CLASS_SEMITONES[pitch_info.pitch_class] +
+            ACCIDENTAL_SEMITONES[pitch_info.accidental])
+
+
+def pitch_info_from_semitone(semitone: int, flat: bool = False) -> PitchInfo:
+    """
+    Get the pitch info of an absolute semitone index, spelled with sharps (default) or flats.
+    """
+    octave, semitone_class = divmod(semitone, SEMITONES_PER_OCTAVE)
+    spelling = (FLAT_SPELLINGS if flat else SHARP_SPELLINGS)[semitone_class]
+    return PitchInfo(pitch_class=spelling.pitch_class,
+                     accidental=spelling.accidental,
+                     register=octave - 1,
+                     enharmonic_pitch_class=spelling.enharmonic_pitch_class,
+                     enharmonic_accidental=spelling.enharmonic_accidental)
+
+
+SHARP_SPELLINGS = _spelling_table(flat=False)
+FLAT_SPELLINGS = _spelling_table(flat=True)
+
+
 def interval_between_frequencies(a: float, b: float):
     """
     Find the interval between two frequencies.
@@ -326,96 +394,73 @@ def matching_pitch_info_generator(p: PitchInfo,
             yield pitch_info, idx
 
 
-def pitch_info_from_pitch_string(pitch_str: str) -> PitchInfo:
+# Scientific pitch notation, with the accidental before or after the register. E.g. C#4, Gb-1, A10, G4b
+PITCH_STRING_REGEX = re.compile(r'^\s*([A-G])([#b]?)(-?\d+)([#b]?)\s*$')
+ACCIDENTAL_SYMBOLS = {'#': Accidental.SHARP, 'b': Accidental.FLAT, '': Accidental.NATURAL}
+
+
+@lru_cache(maxsize=4096)
+def _parse_pitch_string(pitch_str: str) -> Tuple[int, bool]:
     """
-    Parse a pitch string representation. E.g. C#4, A#5, Gb8
+    Parse a pitch string into its absolute semitone index, and whether it is spelled with a flat.
     """
-    parts = tuple((c for c in pitch_str))
-    size = len(parts)
+    match = PITCH_STRING_REGEX.match(pitch_str)
+    if not match or (match.group(2) and match.group(4)):
+        raise ValueError(f"invalid pitch string: {pitch_str!r}")
 
-    pitch_class = register = accidental = None
+    pitch_class, accidental_before, register, accidental_after = match.groups()
+    accidental = ACCIDENTAL_SYMBOLS[accidental_before or accidental_after]
+    flat = accidental == Accidental.FLAT
 
-    if size == 1:
-        (pitch_class,) = parts
-    elif size == 2:
-        (pitch_class, register) = parts
-    elif size >= 3:
-        (pitch_class, accidental, register) = parts[:3]
+    semitone = semitone_from_pitch_info(PitchInfo(pitch_class=pitch_class, accidental=accidental,
+                                                  register=int(register)))
 
-    accidental = Accidental.SHARP if accidental == '#' \
-        else Accidental.FLAT if accidental == 'b' \
-        else Accidental.NATURAL
+    if pitch_info_from_semitone(semitone, flat=flat).pitch_class != pitch_class:
+        raise ValueError(f"unsupported pitch spelling: {pitch_str!r}")
 
-    register = int(register)
-    pitch_info = PitchInfo(pitch_class=pitch_class, accidental=accidental)
+    return semitone, flat
 
-    matching_chromatic_pitch_info, _ = next(
-        matching_pitch_info_generator(pitch_info, CHROMATIC_PITCHES_INFO)
-    )
 
-    final_pitch_info = copy.deepcopy(matching_chromatic_pitch_info)
+def pitch_info_from_pitch_string(pitch_str: str) -> PitchInfo:
+    """
+    Parse a pitch string representation. E.g. C#4, A#5, Gb8
+    """
+    semitone, flat = _parse_pitch_string(pitch_str)
+    return pitch_info_from_semitone(semitone, flat=flat)
 
-    final_pitch_info.register = register
 
-    if is_enharmonic_match(pitch_info, matching_chromatic_pitch_info):
-        final_pitch_info.swap_enharmonic()
+def parse_pitches(pitch_strs: Iterable[str],
+                  as_midi: bool = False,
+                  temperament: Temperament = EqualTemperament12) -> Union[List['Pitch'], np.ndarray]:
+    """
+    Parse many pitch strings in one pass, into a list of pitches or (with as_midi) an array of their midi numbers.
+    """
+    if as_midi:
+        return np.fromiter((_parse_pitch_string(pitch_str)[0] for pitch_str in pitch_strs), dtype=np.int64)
 
-    return final_pitch_info
+    return [Pitch(pitch_str, temperament=temperament) for pitch_str in pitch_strs]
 
 
 def pitch_info_from_frequency(frequency: float) -> PitchInfo:
     """
     Determines the pitch information from a frequency.
     """
-    reference_pitch, reference_pitch_idx = next(complete_pitch_info_generator())
-
-    # how many times and in what direction do we need to reduce/increase octave
-    # to normalize to the same octave range
-    normalization_scale = math.floor(math.log(reference_pitch.frequency, EqualTemperament12.OCTAVE.value) -
-                                     math.log(frequency, EqualTemperament12.OCTAVE.value))
-
-    # normalize the frequency by multiplying with the normalization interval
-    # i.e. the number of octaves we need to normalize the frequency
-    normalization_interval = EqualTemperament12.OCTAVE.value ** normalization_scale
-    normalized_frequency = frequency * normalization_interval
-
-    normalized_interval = interval_between_frequencies(reference_pitch.frequency,
-                                                       normalized_frequency)
-
     # TODO: maybe get more specific about this rounding? What tolerance are we willing to accept when there are extra
     #   decimals?
-    num_semitones_from_reference = round(
-        math.log(normalized_interval, EqualTemperament12.MINOR_SECOND.value)
-    )
-
-    final_pitch_idx = (reference_pitch_idx +
-                       num_semitones_from_reference) % len(CHROMATIC_PITCHES_INFO)
+    pitch_info = pitch_info_from_semitone(round(midi_number_from_frequency(frequency)))
+    pitch_info.frequency = frequency
+    return pitch_info
 
-    found_pitch = CHROMATIC_PITCHES_INFO[final_pitch_idx]
-    final_pitch = copy.deepcopy(found_pitch)
 
-    final_pitch.register = final_pitch.register + (-normalization_scale)
-
-    return final_pitch
-
-
-def frequency_from_pitch_info(pitch_info: PitchInfo):
+def frequency_from_pitch_info(pitch_info: PitchInfo, temperament: Temperament = EqualTemperament12):
     """
-    Determine the frequency from the pitch information.
+    Determine the frequency from the pitch information, tuned relative to the reference pitch with the temperament.
     """
-    reference_pitch, reference_pitch_idx = next(complete_pitch_info_generator())
-    matching_pitch, matching_pitch_idx = next(
-        matching_pitch_info_generator(PitchInfo(pitch_class=pitch_info.pitch_class,
-                                                accidental=pitch_info.accidental)))
-
-    num_semitones_from_reference = abs(matching_pitch_idx - reference_pitch_idx)
-
-    octave_difference = pitch_info.register - matching_pitch.register
-
-    base_frequency = reference_pitch.frequency * (EqualTemperament12.MINOR_SECOND.value ** num_semitones_from_reference)
-
-    final_frequency = base_frequency * (EqualTemperament12.OCTAVE.value ** octave_difference)
-    return final_frequency
+    octaves, semitones = divmod(semitone_from_pitch_info(pitch_info) - REFERENCE_PITCH_INFO.midi_number,
+                                SEMITONES_PER_OCTAVE)
+    temperament_12 = temperament.temperament_12
+    return REFERENCE_PITCH_INFO.frequency * temperament_12.intervals[semitones].value * \
+        temperament_12.OCTAVE.value ** octaves
 
 
 def midi_number_from_frequency(frequency: float):
@@ -423,8 +468,8 @@ def midi_number_from_frequency(frequency: float):
     Get midi-number from frequency (12-tone equal temperament).
     Source: https://www.inspiredacoustics.com/en/MIDI_note_numbers_and_center_frequencies
     """
-    reference_pitch, _ = next(complete_pitch_info_generator())
-    return reference_pitch.midi_number + (12 * math.log(frequency / reference_pitch.frequency, 2))
+    return REFERENCE_PITCH_INFO.midi_number + SEMITONES_PER_OCTAVE * math.log2(frequency /
+                                                                               REFERENCE_PITCH_INFO.frequency)
 
 
 def frequency_from_midi_number(midi_number: float):
@@ -432,13 +477,25 @@ def frequency_from_midi_number(midi_number: float):
     Get frequency from midi-number (12-tone equal temperament).
     Source: https://www.inspiredacoustics.com/en/MIDI_note_numbers_and_center_frequencies
     """
-    reference_pitch, _ = next(complete_pitch_info_generator())
-    return reference_pitch.frequency * 2 ** ((midi_number - reference_pitch.midi_number) / 12)
+    return REFERENCE_PITCH_INFO.frequency * 2 ** ((midi_number - REFERENCE_PITCH_INFO.midi_number) /
+                                                  SEMITONES_PER_OCTAVE)
 
 
 class Pitch(PitchInfo):
-    def __init__(
-            self,
+    """
+    An immutable, hashable pitch.
+
+    Pitches are interned: constructing a pitch equivalent to one that is already alive (same midi number, spelling
+    and temperament) returns the existing instance, and repeated constructions with the same arguments are a cache
+    lookup. The temperament is used to tune pitches that are identified by name; frequency and midi number
+    identifiers are taken as they are.
+    """
+    __slots__ = ('temperament', '_key', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(
+            cls,
             identifier: Union[str, int, float] = None,
             midi_number: float = None,
             pitch_class=None,
@@ -446,59 +503,110 @@ class Pitch(PitchInfo):
             register=4,
             enharmonic_pitch_class=None,
             enharmonic_accidental=None,
+            temperament: Temperament = EqualTemperament12,
     ):
+        return _interned_pitch(cls, identifier, midi_number, pitch_class, accidental, register,
+                               enharmonic_pitch_class, enharmonic_accidental, temperament)
 
+    def __init__(self, *args, **kwargs):
+        # pitches are fully initialized when they are created (and interned) in __new__
+        pass
+
+    def _initialize(self, identifier, midi_number, pitch_class, accidental, register,
+                    enharmonic_pitch_class, enharmonic_accidental, temperament):
         is_pitch_string_identifier = isinstance(identifier, str)
         is_frequency_identifier = isinstance(identifier, (int, float))
 
         frequency = identifier if is_frequency_identifier else None
         pitch_string = identifier if is_pitch_string_identifier else None
 
-        super(Pitch, self).__init__(frequency=frequency,
-                                    pitch_class=pitch_class,
-                                    accidental=accidental,
-                                    register=register,
-                                    enharmonic_pitch_class=enharmonic_pitch_class,
-                                    enharmonic_accidental=enharmonic_accidental,
-                                    midi_number=midi_number)
-
-        if is_pitch_complete(self):
-            return
-
-        if frequency is not None:
-            pitch_info = pitch_info_from_frequency(frequency)
-            self.frequency = frequency
-        elif pitch_string is not None:
-            pitch_info = pitch_info_from_pitch_string(pitch_string)
-            self.frequency = frequency_from_pitch_info(pitch_info)
-        elif midi_number is not None:
-            self.midi_number = midi_number
-            self.frequency = frequency_from_midi_number(midi_number)
-            pitch_info = pitch_info_from_frequency(self.frequency)
-        else:
-            pitch_info = PitchInfo(pitch_class=self.pitch_class,
-                                   accidental=self.accidental,
-                                   register=self.register)
-            self.frequency = frequency_from_pitch_info(pitch_info)
+        info = PitchInfo(frequency=frequency,
+                         pitch_class=pitch_class,
+                         accidental=accidental,
+                         register=register,
+                         enharmonic_pitch_class=enharmonic_pitch_class,
+                         enharmonic_accidental=enharmonic_accidental,
+                         midi_number=midi_number)
+
+        if not is_pitch_complete(info):
+            if frequency is not None:
+                pitch_info = pitch_info_from_frequency(frequency)
+            elif pitch_string is not None:
+                pitch_info = pitch_info_from_pitch_string(pitch_string)
+                info.frequency = frequency_from_pitch_info(pitch_info, temperament)
+            elif midi_number is not None:
+                info.frequency = frequency_from_midi_number(midi_number)
+                pitch_info = pitch_info_from_frequency(info.frequency)
+            else:
+                pitch_info = PitchInfo(pitch_class=info.pitch_class,
+                                       accidental=info.accidental,
+                                       register=info.register)
+                info.frequency = frequency_from_pitch_info(pitch_info, temperament)
 
-        self.pitch_class = pitch_info.pitch_class
-        self.accidental = pitch_info.accidental
-        self.register = pitch_info.register
-        self.enharmonic_pitch_class = pitch_info.enharmonic_pitch_class
-        self.enharmonic_accidental = pitch_info.enharmonic_accidental
+            info.pitch_class = pitch_info.pitch_class
+            info.accidental = pitch_info.accidental
+            info.register = pitch_info.register
+            info.enharmonic_pitch_class = pitch_info.enharmonic_pitch_class
+            info.enharmonic_accidental = pitch_info.enharmonic_accidental
 
-        self.midi_number = self.midi_number if self.midi_number is not None \
-            else midi_number_from_frequency(self.frequency)
+            info.midi_number = info.midi_number if info.midi_number is not None \
+                else midi_number_from_frequency(info.frequency)
+
+        for field in fields(PitchInfo):
+            object.__setattr__(self, field.name, getattr(info, field.name))
+
+        object.__setattr__(self, 'temperament', temperament)
+        object.__setattr__(self, '_key', (round(info.midi_number, PITCH_KEY_PRECISION),
+                                          info.pitch_class, info.accidental, info.register, temperament))
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __eq__(self, other):
+        if isinstance(other, Pitch):
+            return self._key == other._key
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        args = (self.frequency, self.midi_number, self.pitch_class, self.accidental, self.register,
+                self.enharmonic_pitch_class, self.enharmonic_accidental)
+        # the default temperament is left out so that unpickled pitches intern with the module-level one
+        if self.temperament is not EqualTemperament12:
+            args = args + (self.temperament,)
+        return self.__class__, args
 
     def __repr__(self):
         return f"{self.__class__.__name__}<{self.frequency},{self.pitch_class},{self.accidental},{self.register}," \
                f"{self.midi_number}>"
 
     def next(self):
-        return super(Pitch, self).next().to_pitch()
+        return self.transpose(1)
 
     def prev(self):
-        return super(Pitch, self).prev().to_pitch()
+        return self.transpose(-1)
+
+    def transpose(self, semitones: int):
+        return super(Pitch, self).transpose(semitones).to_pitch(self.temperament)
+
+    def to_pitch(self, temperament: Temperament = None):
+        if temperament is None or temperament is self.temperament:
+            return self
+        return Pitch(pitch_class=self.pitch_class,
+                     accidental=self.accidental,
+                     register=self.register,
+                     temperament=temperament)
 
     def matches(self,
                 other: 'Pitch',
@@ -518,7 +626,7 @@ class Pitch(PitchInfo):
         if key_signature and isinstance(key_signature, KeySignature):
             scale = key_signature.scale
             random_index = random.randrange(0, len(scale))
-            return scale[random_index].to_pitch()
+            return scale[random_index]
         else:
             pitch_class = random_element(PitchClass.all())
             register = register if register else random_element(list(range(2, 6)))  # roughly range of 88-key keyboard
@@ -528,15 +636,140 @@ class Pitch(PitchInfo):
             return Pitch(pitch_class=pitch_class, accidental=accidental, register=register)
 
 
+def midi_numbers_from_frequencies(frequencies: np.ndarray) -> np.ndarray:
+    """
+    Vectorized midi_number_from_frequency.
+    """
+    return REFERENCE_PITCH_INFO.midi_number + SEMITONES_PER_OCTAVE * np.log2(np.asarray(frequencies, dtype=float) /
+                                                                             REFERENCE_PITCH_INFO.frequency)
+
+
+def frequencies_from_midi_numbers(midi_numbers: np.ndarray) -> np.ndarray:
+    """
+    Vectorized frequency_from_midi_number.
+    """
+    return REFERENCE_PITCH_INFO.frequency * 2 ** ((np.asarray(midi_numbers, dtype=float) -
+                                                   REFERENCE_PITCH_INFO.midi_number) / SEMITONES_PER_OCTAVE)
+
+
+class PitchArray:
+    """
+    Many pitches stored as parallel arrays of frequencies, midi numbers, pitch class indexes (semitones above C) and
+    registers, so that conversions between them can be done for all pitches at once.
+    Pitches are named with sharps, like pitches identified by frequency.
+    """
+
+    # pitch strings of each pitch class index, e.g. 'C#'
+    PITCH_CLASS_NAMES = np.array([f"{spelling.pitch_class}{'#' if spelling.accidental == Accidental.SHARP else ''}"
+                                  for spelling in SHARP_SPELLINGS])
+
+    def __init__(self, frequencies: Iterable[float], midi_numbers: Iterable[float] = None):
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        self.midi_numbers = midi_numbers_from_frequencies(self.frequencies) if midi_numbers is None \
+            else np.asarray(midi_numbers, dtype=float)
+
+        semitones = np.rint(self.midi_numbers).astype(np.int64)
+        registers, self.pitch_class_indexes = np.divmod(semitones, SEMITONES_PER_OCTAVE)
+        self.registers = registers - 1
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}<{len(self)}>"
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def __getitem__(self, item):
+        if isinstance(item, (int, np.integer)):
+            return Pitch(float(self.frequencies[item]))
+        return PitchArray(self.frequencies[item], self.midi_numbers[item])
+
+    @staticmethod
+    def from_frequencies(frequencies: Iterable[float]) -> 'PitchArray':
+        return PitchArray(frequencies)
+
+    @staticmethod
+    def from_midi(midi_numbers: Iterable[float]) -> 'PitchArray':
+        midi_numbers = np.asarray(midi_numbers, dtype=float)
+        return PitchArray(frequencies_from_midi_numbers(midi_numbers), midi_numbers)
+
+    @staticmethod
+    def from_names(names: Iterable[str], temperament: Temperament = EqualTemperament12) -> 'PitchArray':
+        """
+        Create pitches from pitch strings. Each distinct pitch string is only parsed once.
+        """
+        unique_names, inverse = np.unique(np.asarray(names, dtype=str), return_inverse=True)
+        unique_frequencies = np.array([frequency_from_pitch_info(pitch_info_from_pitch_string(name), temperament)
+                                       for name in unique_names], dtype=float)
+        return PitchArray(unique_frequencies[inverse.reshape(-1)])
+
+    @staticmethod
+    def from_pitches(pitches: Iterable[Pitch]) -> 'PitchArray':
+        pitches = list(pitches)
+        return PitchArray([pitch.frequency for pitch in pitches], [pitch.midi_number for pitch in pitches])
+
+    def names(self) -> np.ndarray:
+        """
+        Get the pitch strings of the pitches, e.g. 'A#4'.
+        """
+        return np.char.add(self.PITCH_CLASS_NAMES[self.pitch_class_indexes], self.registers.astype(str))
+
+    def transpose(self, semitones: float) -> 'PitchArray':
+        """
+        Transpose all pitches by a (12-tone equal temperament) number of semitones.
+        """
+        return PitchArray(self.frequencies * 2 ** (semitones / SEMITONES_PER_OCTAVE), self.midi_numbers + semitones)
+
+    def matches(self,
+                other: Union['PitchArray', Pitch, float, np.ndarray],
+                tolerance=EqualTemperament12.MINOR_SECOND.value / 4) -> np.ndarray:
+        """
+        Vectorized Pitch.matches against another pitch, frequency or array of them (broadcast like numpy arrays).
+        """
+        other_frequencies = other.frequencies if isinstance(other, PitchArray) \
+            else other.frequency if isinstance(other, Pitch) \
+            else np.asarray(other, dtype=float)
+
+        octaves_interval = np.abs(np.log2(other_frequencies / self.frequencies))
+        return (octaves_interval % 1) < tolerance
+
+    def to_pitches(self) -> List[Pitch]:
+        return [Pitch(frequency) for frequency in self.frequencies.tolist()]
+
+
+# Number of decimals of the midi number that identify an interned pitch
+PITCH_KEY_PRECISION = 6
+
+
+@lru_cache(maxsize=4096)
+def _interned_pitch(cls, *args) -> 'Pitch':
+    """
+    Create a pitch from the constructor arguments, or reuse the interned instance of an equivalent pitch.
+    """
+    pitch = object.__new__(cls)
+    pitch._initialize(*args)
+    return cls._interned.setdefault(pitch._key, pitch)
+
+
+@lru_cache(maxsize=256)
+def scale_pitches(root_frequency: float,
+                  mode: ScaleMode,
+                  temperament: Temperament = EqualTemperament12) -> Tuple[Pitch, ...]:
+    """
+    Build the pitches of a scale once per (root frequency, mode, temperament) and share the result.
+    The scale is returned as a tuple so that cached scales cannot be modified by callers.
+    """
+    return tuple(map(Pitch, ScaleFactory.get_scale(root_frequency, mode, temperament)))
+
+
 class KeySignature:
-    def __init__(self, pitch: Pitch, mode: ScaleMode):
+    def __init__(self, pitch: Pitch, mode: ScaleMode, temperament: Temperament = EqualTemperament12):
         self.pitch = pitch
         self.mode = mode
+        self.temperament = temperament
 
     @property
-    def scale(self):
-        return list(map(Pitch, ScaleFactory.get_scale(self.pitch.frequency,
-                                                      self.mode)))
+    def scale(self) -> Tuple[Pitch, ...]:
+        return scale_pitches(self.pitch.frequency, self.mode, self.temperament)
 
 
 # TODO: in general pass CHROMATIC_PITCHES_INFO as arg (maybe 'base_pitches_info') to allow for different
@@ -0,0 +1,365 @@
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Iterable, Union, Callable, Generator
+
+import numpy as np
+
+from .notes import Note
+from .pitches import Pitch
+from .scores import Score
+from .timeline import Timeline
+from .tone import Tone, SAMPLE_RATE, open_pcm16_wav, notes_with_lengths
+
+# Number of samples an audio device asks for per callback
+DEFAULT_FRAMES_PER_BUFFER = 1024
+
+# Seconds of audio rendered ahead of the device
+DEFAULT_BUFFER_DURATION = 0.5
+
+
+class RingBuffer:
+    """
+    A fixed-size FIFO of 16-bit PCM samples, for one producer thread and one consumer thread.
+
+    The producer only advances the write count and the consumer only advances the read count, each after copying the
+    samples, so neither side takes a lock (e.g. in an audio callback).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self._samples = np.zeros(capacity, dtype=np.int16)
+        self._num_written = 0
+        self._num_read = 0
+
+    def __repr__(self) -> str:
+        return f"RingBuffer<{len(self)}/{self.capacity}>"
+
+    def __len__(self) -> int:
+        return self._num_written - self._num_read
+
+    @property
+    def free(self) -> int:
+        return self.capacity - len(self)
+
+    def write(self, samples: np.ndarray) -> int:
+        """
+        Write as many of the samples as fit, and get the number written.
+        """
+        size = min(len(samples), self.free)
+        start = self._num_written % self.capacity
+        first = min(size, self.capacity - start)
+        self._samples[start:start + first] = samples[:first]
+        self._samples[:size - first] = samples[first:size]
+        self._num_written += size
+        return size
+
+    def read(self, out: np.ndarray) -> int:
+        """
+        Read up to len(out) samples into out, and get the number read (the rest of out is left as it is).
+        """
+        size = min(len(out), len(self))
+        start = self._num_read % self.capacity
+        first = min(size, self.capacity - start)
+        out[:first] = self._samples[start:start + first]
+        out[first:size] = self._samples[:size - first]
+        self._num_read += size
+        return size
+
+
+class AudioDevice:
+    """
+    An audio output that pulls 16-bit PCM samples from a callback, which is called with the number of samples wanted.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frames_per_buffer: int = DEFAULT_FRAMES_PER_BUFFER):
+        self.sample_rate = sample_rate
+        self.frames_per_buffer = frames_per_buffer
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}<{self.sample_rate},{self.frames_per_buffer}>"
+
+    def start(self, callback: Callable[[int], np.ndarray]):
+        raise NotImplementedError()
+
+    def stop(self):
+        raise NotImplementedError()
+
+
+class PyAudioDevice(AudioDevice):
+    """
+    The default output of the sound card, through a callback-based pyaudio stream.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frames_per_buffer: int = DEFAULT_FRAMES_PER_BUFFER):
+        super().__init__(sample_rate, frames_per_buffer)
+        self._pyaudio = None
+        self._stream = None
+
+    def start(self, callback: Callable[[int], np.ndarray]):
+        import pyaudio
+
+        def stream_callback(in_data, frame_count, time_info, status):
+            return callback(frame_count).tobytes(), pyaudio.paContinue
+
+        self._pyaudio = pyaudio.PyAudio()
+        self._stream = self._pyaudio.open(format=pyaudio.paInt16, channels=1, rate=self.sample_rate, output=True,
+                                          frames_per_buffer=self.frames_per_buffer, stream_callback=stream_callback)
+
+    def stop(self):
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+            self._pyaudio.terminate()
+            self._stream = None
+            self._pyaudio = None
+
+
+class NullDevice(AudioDevice):
+    """
+    A stand-in for a sound card, which pulls samples from a thread and discards them. With realtime, samples are
+    pulled at the pace of a device playing them, otherwise as fast as possible.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frames_per_buffer: int = DEFAULT_FRAMES_PER_BUFFER,
+                 realtime: bool = True):
+        super().__init__(sample_rate, frames_per_buffer)
+        self.realtime = realtime
+        self.frames_pulled = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _output(self, samples: np.ndarray):
+        pass
+
+    def _run(self, callback: Callable[[int], np.ndarray]):
+        buffer_duration = self.frames_per_buffer / self.sample_rate
+        deadline = time.perf_counter()
+
+        while not self._stopped.is_set():
+            self._output(callback(self.frames_per_buffer))
+            self.frames_pulled += self.frames_per_buffer
+
+            if self.realtime:
+                deadline += buffer_duration
+                self._stopped.wait(max(0.0, deadline - time.perf_counter()))
+
+    def start(self, callback: Callable[[int], np.ndarray]):
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, args=(callback,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+
+class FileDevice(NullDevice):
+    """
+    A stand-in for a sound card, which writes the samples it pulls (including silence) to a wav file.
+    """
+
+    def __init__(self, file_path: str, sample_rate: int = SAMPLE_RATE,
+                 frames_per_buffer: int = DEFAULT_FRAMES_PER_BUFFER, realtime: bool = False):
+        super().__init__(sample_rate, frames_per_buffer, realtime)
+        self.file_path = file_path
+        self._wav_file = None
+
+    def _output(self, samples: np.ndarray):
+        self._wav_file.writeframes(samples)
+
+    def start(self, callback: Callable[[int], np.ndarray]):
+        self._wav_file = open_pcm16_wav(self.file_path, self.sample_rate)
+        super().start(callback)
+
+    def stop(self):
+        super().stop()
+        if self._wav_file is not None:
+            self._wav_file.close()
+            self._wav_file = None
+
+
+class Playback:
+    """
+    Non-blocking playback of a melody. A render thread synthesizes the melody ahead of time into a ring buffer, which
+    the audio device's callback reads from, so the caller is free while the melody plays.
+
+    The device is started once the buffer is full (or the whole melody is rendered). If the render thread falls
+    behind, the device plays silence and the underrun is counted.
+
+    Notes are only taken from the melody as they are rendered, so it may be an endless generator, played in constant
+    memory. A note is then heard at most latency_bound seconds after it is generated, which can be set with latency
+    (instead of buffer_duration). The longest latency of the notes played so far is kept in max_latency.
+    """
+
+    def __init__(self,
+                 tone: Tone = None,
+                 device: AudioDevice = None,
+                 buffer_duration: float = DEFAULT_BUFFER_DURATION,
+                 latency: float = None):
+        self.tone = tone if tone is not None else Tone.default()
+        self.device = device if device is not None else PyAudioDevice(self.tone.sample_rate)
+        self.underruns = 0
+        self.frames_played = 0
+        self.max_latency = 0.0
+
+        sample_rate = self.tone.sample_rate
+        frames_per_buffer = self.device.frames_per_buffer
+        if latency is not None:
+            # besides the ring buffer, a note may wait for the rest of a block to be rendered, and for a callback
+            buffer_duration = latency - 2 * frames_per_buffer / sample_rate
+            if buffer_duration * sample_rate < frames_per_buffer:
+                raise ValueError(f"a latency of {latency}s is too short for buffers of {frames_per_buffer} samples")
+
+        self._ring = RingBuffer(max(int(buffer_duration * sample_rate), frames_per_buffer))
+        self._note_starts = deque()
+        self._paused = False
+        self._stopped = threading.Event()
+        self._rendered = threading.Event()
+        self._finished = threading.Event()
+        self._on_finished = None
+        self._render_thread = None
+
+    def __repr__(self) -> str:
+        return f"Playback<{self.tone},{self.device},{self.frames_played}>"
+
+    @property
+    def is_playing(self) -> bool:
+        return self._render_thread is not None and not self._finished.is_set() and not self._stopped.is_set()
+
+    @property
+    def is_paused(self) -> bool:
+        return self._paused
+
+    @property
+    def latency_bound(self) -> float:
+        """
+        The longest time (in seconds) between taking a note from the melody and starting to play it, while playback
+        keeps up and isn't paused.
+        """
+        return (self._ring.capacity + 2 * self.device.frames_per_buffer) / self.tone.sample_rate
+
+    def _timed_notes(self, notes: Iterable[Union[float, Pitch, Note]],
+                     duration: float) -> Generator[Union[float, Pitch, Note], None, None]:
+        """
+        Record the sample at which each note starts, and when it was taken from the melody.
+        """
+        start = 0
+        for note, length in notes_with_lengths(notes, duration, self.tone.sample_rate):
+            self._note_starts.append((start, time.perf_counter()))
+            start += length
+            yield note
+
+    def pause(self):
+        """
+        Play silence until resumed, keeping the position in the melody.
+        """
+        self._paused = True
+
+    def resume(self):
+        self._paused = False
+
+    def _render(self, blocks: Iterable[np.ndarray], primed: threading.Event):
+        wait = self.device.frames_per_buffer / self.tone.sample_rate / 2
+
+        try:
+            for block in blocks:
+                offset = 0
+                while offset < len(block):
+                    if self._stopped.is_set():
+                        return
+                    written = self._ring.write(block[offset:])
+                    offset += written
+                    if not self._ring.free:
+                        primed.set()
+                    if not written:
+                        self._stopped.wait(wait)
+
+            self._rendered.set()
+        finally:
+            primed.set()
+
+    def _callback(self, frames: int) -> np.ndarray:
+        out = np.zeros(frames, dtype=np.int16)
+        if self._paused or self._finished.is_set():
+            return out
+
+        # read whether the melody is fully rendered before reading, so that no samples written after are missed
+        rendered = self._rendered.is_set()
+        num_read = self._ring.read(out)
+        self.frames_played += num_read
+
+        note_starts = self._note_starts
+        if note_starts and note_starts[0][0] < self.frames_played:
+            now = time.perf_counter()
+            while note_starts and note_starts[0][0] < self.frames_played:
+                self.max_latency = max(self.max_latency, now - note_starts.popleft()[1])
+
+        if num_read < frames:
+            if rendered:
+                self._finished.set()
+                if self._on_finished is not None:
+                    self._on_finished()
+            else:
+                self.underruns += 1
+
+        return out
+
+    def start(self, notes: Union[Iterable[Union[float, Pitch, Note]], Score, Timeline], duration: float = 1):
+        """
+        Start playing a melody, a score (with every track at its onsets) or a timeline in the background.
+        """
+        if self._render_thread is not None:
+            raise RuntimeError(f"{self} has already been started")
+
+        if isinstance(notes, Score):
+            timeline = Timeline(self.tone)
+            timeline.add_score(notes)
+            notes = timeline
+
+        primed = threading.Event()
+        blocks = notes.stream(block_size=self.device.frames_per_buffer) if isinstance(notes, Timeline) \
+            else self.tone.stream_melody(self._timed_notes(notes, duration), duration,
+                                         block_size=self.device.frames_per_buffer)
+        self._render_thread = threading.Thread(target=self._render, args=(blocks, primed), daemon=True)
+        self._render_thread.start()
+
+        primed.wait()
+        if not self._stopped.is_set():
+            self.device.start(self._callback)
+
+    def stop(self):
+        """
+        Stop playing (and rendering) the melody.
+        """
+        self._stopped.set()
+        self.device.stop()
+        if self._render_thread is not None:
+            self._render_thread.join()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Wait for the melody to finish playing, and get whether it did.
+        """
+        return self._finished.wait(timeout)
+
+    async def play(self, notes: Union[Iterable[Union[float, Pitch, Note]], Score, Timeline], duration: float = 1):
+        """
+        Play a melody, score or timeline without blocking the event loop. Cancelling the task stops playback.
+        """
+        loop = asyncio.get_running_loop()
+        finished = loop.create_future()
+
+        def set_finished():
+            if not finished.done():
+                finished.set_result(None)
+
+        self._on_finished = lambda: loop.call_soon_threadsafe(set_finished)
+        try:
+            await loop.run_in_executor(None, self.start, notes, duration)
+            await finished
+        finally:
+            self.stop()
@@ -0,0 +1,242 @@
+from typing import List, Iterable
+
+import numpy as np
+
+from .notes import Note, Duration, TimeSignature, TempoMap, seconds_from_ticks, onset_ticks
+from .pitches import Pitch, midi_numbers_from_frequencies
+
+# Columns of a note in a track. Onsets and durations are in seconds.
+NOTE_DTYPE = np.dtype([('onset', np.float64),
+                       ('duration', np.float64),
+                       ('midi_number', np.float64),
+                       ('frequency', np.float64),
+                       ('velocity', np.uint8)])
+
+DEFAULT_VELOCITY = 110  # range: 0-127
+DEFAULT_TRACK_CAPACITY = 64
+
+
+class Track:
+    """
+    A sequence of notes ordered by onset, stored column-wise in a NumPy structured array.
+
+    Appending grows the underlying array geometrically, and time-range queries and bars are views of it (no copies).
+    """
+
+    def __init__(self, notes: np.ndarray = None, name: str = None, capacity: int = DEFAULT_TRACK_CAPACITY):
+        self.name = name
+        self._size = 0
+        self._data = np.empty(max(capacity, 1), dtype=NOTE_DTYPE)
+
+        if notes is not None:
+            self.extend(notes)
+
+    def __repr__(self) -> str:
+        return f"Track<{self.name},{len(self)}>"
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __getitem__(self, item) -> np.ndarray:
+        return self.notes[item]
+
+    @property
+    def notes(self) -> np.ndarray:
+        return self._data[:self._size]
+
+    @property
+    def onsets(self) -> np.ndarray:
+        return self.notes['onset']
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.notes['duration']
+
+    @property
+    def midi_numbers(self) -> np.ndarray:
+        return self.notes['midi_number']
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        return self.notes['frequency']
+
+    @property
+    def velocities(self) -> np.ndarray:
+        return self.notes['velocity']
+
+    @property
+    def end(self) -> float:
+        """
+        The time at which the last sounding note of the track ends.
+        """
+        return float(np.max(self.onsets + self.durations)) if self._size else 0.0
+
+    def _reserve(self, size: int):
+        if size > len(self._data):
+            data = np.empty(max(size, 2 * len(self._data)), dtype=NOTE_DTYPE)
+            data[:self._size] = self.notes
+            self._data = data
+
+    def append(self,
+               onset: float,
+               duration: float,
+               frequency: float,
+               velocity: int = DEFAULT_VELOCITY,
+               midi_number: float = None):
+        """
+        Append a note. Notes must be appended in order of onset.
+        """
+        if self._size and onset < self._data[self._size - 1]['onset']:
+            raise ValueError(f"note onset {onset} is before the onset of the last note in the track")
+
+        midi_number = midi_number if midi_number is not None \
+            else float(midi_numbers_from_frequencies(frequency))
+
+        self._reserve(self._size + 1)
+        self._data[self._size] = (onset, duration, midi_number, frequency, velocity)
+        self._size += 1
+
+    def append_note(self, note: Note, onset: float = None, velocity: int = DEFAULT_VELOCITY):
+        """
+        Append a note, by default right after the previous note of the track.
+        """
+        if onset is None:
+            onset = float(self._data[self._size - 1]['onset'] + self._data[self._size - 1]['duration']) \
+                if self._size else 0.0
+
+        self.append(onset, note.duration.value, note.pitch.frequency, velocity, note.pitch.midi_number)
+
+    def extend(self, notes: np.ndarray):
+        """
+        Append a structured array of notes (with NOTE_DTYPE fields), ordered by onset.
+        """
+        notes = np.asarray(notes, dtype=NOTE_DTYPE)
+        if not len(notes):
+            return
+
+        if np.any(np.diff(notes['onset']) < 0) or \
+                (self._size and notes['onset'][0] < self._data[self._size - 1]['onset']):
+            raise ValueError("notes must be ordered by onset")
+
+        self._reserve(self._size + len(notes))
+        self._data[self._size:self._size + len(notes)] = notes
+        self._size += len(notes)
+
+    def between(self, start: float, end: float) -> np.ndarray:
+        """
+        Get a view of the notes with an onset in the time range [start, end).
+        """
+        onsets = self.onsets
+        start_idx, end_idx = np.searchsorted(onsets, [start, end], side='left')
+        return self.notes[start_idx:end_idx]
+
+    def bars(self, bar_duration: float) -> List[np.ndarray]:
+        """
+        Split the track into views of the notes starting in each bar.
+        """
+        if not self._size:
+            return []
+
+        num_bars = int(np.floor(self.onsets[-1] / bar_duration)) + 1
+        boundaries = np.searchsorted(self.onsets, np.arange(1, num_bars) * bar_duration, side='left')
+        return np.split(self.notes, boundaries)
+
+    def to_notes(self, bpm: int = None, time_signature: TimeSignature = None) -> List[Note]:
+        return [Note(pitch=Pitch(frequency), duration=Duration(duration, bpm=bpm, time_signature=time_signature))
+                for frequency, duration in zip(self.frequencies.tolist(), self.durations.tolist())]
+
+    @staticmethod
+    def from_notes(notes: Iterable[Note], name: str = None, velocity: int = DEFAULT_VELOCITY) -> 'Track':
+        """
+        Create a track from a melody, with each note starting when the previous one ends. If every note has a length
+        in ticks at the same tempo, onsets are summed in ticks, so they don't drift over long melodies.
+        """
+        notes = list(notes)
+        data = np.empty(len(notes), dtype=NOTE_DTYPE)
+        data['duration'] = [note.duration.value for note in notes]
+        data['midi_number'] = [note.pitch.midi_number for note in notes]
+        data['frequency'] = [note.pitch.frequency for note in notes]
+        data['velocity'] = velocity
+
+        tempos = {(note.duration.bpm, note.duration.time_signature.beat_value) if note.duration.ticks is not None
+                  else None for note in notes}
+        if len(tempos) == 1 and None not in tempos:
+            (bpm, beat_value), = tempos
+            data['onset'] = seconds_from_ticks(onset_ticks([note.duration.ticks for note in notes]), bpm, beat_value)
+        else:
+            data['onset'] = np.concatenate(([0], np.cumsum(data['duration'])[:-1])) if notes else []
+        return Track(data, name=name, capacity=len(notes))
+
+    @staticmethod
+    def from_beats(onsets: np.ndarray,
+                   durations: np.ndarray,
+                   frequencies: np.ndarray,
+                   tempo_map: TempoMap,
+                   name: str = None,
+                   velocity: int = DEFAULT_VELOCITY,
+                   midi_numbers: np.ndarray = None) -> 'Track':
+        """
+        Create a track from notes timed in beats (ordered by onset), converting their times to seconds with a tempo
+        map.
+        """
+        onsets = np.asarray(onsets, dtype=float)
+        frequencies = np.asarray(frequencies, dtype=float)
+        data = np.empty(len(onsets), dtype=NOTE_DTYPE)
+        data['onset'] = tempo_map.seconds_from_beats(onsets)
+        data['duration'] = tempo_map.seconds_from_beats(onsets + np.asarray(durations, dtype=float)) - data['onset']
+        data['midi_number'] = midi_numbers if midi_numbers is not None else midi_numbers_from_frequencies(frequencies)
+        data['frequency'] = frequencies
+        data['velocity'] = velocity
+        return Track(data, name=name, capacity=len(onsets))
+
+
+class Score:
+    """
+    A piece made up of tracks that share a tempo and time signature. Its tempo may change over time, following a tempo
+    map (counted in beats of the time signature), which then starts at bpm.
+    """
+
+    def __init__(self,
+                 tracks: List[Track] = None,
+                 bpm: int = None,
+                 time_signature: TimeSignature = None,
+                 tempo_map: TempoMap = None):
+        self.tracks = tracks if tracks else []
+        self.bpm = bpm if bpm is not None or tempo_map is None else tempo_map.bpms[0]
+        self.time_signature = time_signature
+        self.tempo_map = tempo_map if tempo_map is not None else TempoMap.constant(bpm) if bpm else None
+
+    def __repr__(self) -> str:
+        return f"Score<{len(self.tracks)},{self.bpm},{self.time_signature}>"
+
+    @property
+    def end(self) -> float:
+        return max((track.end for track in self.tracks), default=0.0)
+
+    @property
+    def bar_duration(self) -> float:
+        if not self.bpm or not self.time_signature:
+            raise AttributeError(f"{self.__class__.__name__} needs a bpm and time signature to have bars")
+
+        return seconds_from_ticks(self.time_signature.ticks_per_bar, self.bpm, self.time_signature.beat_value)
+
+    def add_track(self, track: Track = None) -> Track:
+        track = track if track is not None else Track()
+        self.tracks.append(track)
+        return track
+
+    def between(self, start: float, end: float) -> List[np.ndarray]:
+        """
+        Get views of the notes of each track with an onset in the time range [start, end).
+        """
+        return [track.between(start, end) for track in self.tracks]
+
+    def bars(self, track_idx: int = 0) -> List[np.ndarray]:
+        return self.tracks[track_idx].bars(self.bar_duration)
+
+    def to_notes(self, track_idx: int = 0) -> List[Note]:
+        return self.tracks[track_idx].to_notes(self.bpm, self.time_signature)
+
+    @staticmethod
+    def from_notes(notes: Iterable[Note], bpm: int = None, time_signature: TimeSignature = None) -> 'Score':
+        return Score([Track.from_notes(notes)], bpm=bpm, time_signature=time_signature)
@@ -1,5 +1,10 @@
 import time
+import warnings
+from typing import Generator
+
 from .tone import Tone
+from .timeline import Timeline
+from .playback import Playback, AudioDevice
 from .chords import ChordFactory, ChordQuality
 from .intervals import EqualTemperament12, sharpen, flatten
 from .pitches import Pitch, KeySignature
@@ -8,7 +13,24 @@ from .scales import ScaleMode
 from .utils import filename_timestamp
 
 
-def rest(duration=0.005):
+# Silence between the repeats of a song
+BAR_REST = 0.005
+
+# Seconds between generating a note of an endless song and hearing it
+AMBIENT_LATENCY = 0.25
+
+
+def rest(duration=BAR_REST, timeline: Timeline = None):
+    """
+    Rest for a duration of seconds on a timeline.
+
+    Without a timeline this waits instead, as it did before songs were built on Timeline. That's deprecated:
+    use Timeline.add_rest.
+    """
+    if timeline is not None:
+        timeline.add_rest(duration)
+        return
+    warnings.warn("rest() without a timeline is deprecated, use Timeline.add_rest", DeprecationWarning, stacklevel=2)
     time.sleep(duration)
 
 
@@ -21,9 +43,11 @@ def slider_song(bars=2):
                    list(map(flatten, chord)),
                    list(map(flatten, chord))]
 
+    timeline = Timeline()
     for _ in range(bars):
-        Tone.play_progression(progression)
-        rest(0.005)
+        timeline.add_progression(progression)
+        timeline.add_rest(BAR_REST)
+    timeline.play()
 
 
 def summer_fun_song(bars=2):
@@ -36,9 +60,11 @@ def summer_fun_song(bars=2):
                    chord2,
                    chord3]
 
+    timeline = Timeline()
     for _ in range(bars):
-        Tone.play_progression(progression)
-        rest(0.005)
+        timeline.add_progression(progression)
+        timeline.add_rest(BAR_REST)
+    timeline.play()
 
 
 def random_song(bars=2,
@@ -54,9 +80,11 @@ def random_song(bars=2,
     Tone.write_wav_melody(f"random-song{timestamp}.wav", random_notes)
     Tone.write_midi_melody(f"random-song{timestamp}.mid", random_notes)
 
+    timeline = Timeline()
     for _ in range(bars):
-        Tone.play_melody(random_notes)
-        rest(0.005)
+        timeline.add_melody(random_notes)
+        timeline.add_rest(BAR_REST)
+    timeline.play()
 
 
 def scale_song(bars=2,
@@ -64,9 +92,11 @@ def scale_song(bars=2,
                root_frequency=440):
     scale = KeySignature(pitch=Pitch(root_frequency), mode=mode).scale
 
+    timeline = Timeline()
     for _ in range(bars):
-        Tone.play_melody(scale)
-        rest(0.005)
+        timeline.add_melody(scale)
+        timeline.add_rest(BAR_REST)
+    timeline.play()
 
 
 def random_piece(bars=2,
@@ -86,9 +116,42 @@ def random_piece(bars=2,
     Tone.write_wav_melody(f"random-piece{timestamp}.wav", random_notes)
     Tone.write_midi_melody(f"random-piece{timestamp}.mid", random_notes)
 
+    timeline = Timeline()
     for _ in range(bars):
-        Tone.play_melody(random_notes)
-        rest(0.005)
+        timeline.add_melody(random_notes)
+        timeline.add_rest(BAR_REST)
+    timeline.play()
+
+
+def random_notes(mode=ScaleMode.MAJOR,
+                 root_frequency=440,
+                 bpm=80) -> Generator[Note, None, None]:
+    """
+    Generate random notes in a key and tempo, endlessly.
+    """
+    key_signature = KeySignature(pitch=Pitch(root_frequency), mode=mode)
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    while True:
+        yield Note.random(key_signature=key_signature, time_signature=time_signature, bpm=bpm)
+
+
+def ambient_song(mode=ScaleMode.MAJOR,
+                 root_frequency=440,
+                 bpm=80,
+                 latency=AMBIENT_LATENCY,
+                 seconds: float = None,
+                 device: AudioDevice = None) -> Playback:
+    """
+    Play an endless stream of random notes (for a number of seconds, or until interrupted), each generated at most
+    `latency` seconds before it is heard.
+    """
+    playback = Playback(device=device, latency=latency)
+    playback.start(random_notes(mode, root_frequency, bpm))
+    try:
+        playback.wait(seconds)
+    finally:
+        playback.stop()
+    return playback
 
 
 if __name__ == '__main__':
@@ -0,0 +1,203 @@
+from dataclasses import dataclass
+from typing import List, Union, Iterable, Generator
+
+import numpy as np
+
+from .notes import Note, Duration, samples_from_ticks, seconds_from_ticks
+from .pitches import Pitch
+from .scores import Track, Score
+from .tone import Tone, DEFAULT_BLOCK_SIZE, extract_frequency, extract_duration, num_samples, pcm16_from_wave
+
+
+@dataclass(frozen=True)
+class TimelineEvent:
+    """
+    A note (one frequency) or chord (several) that starts at a sample offset of a timeline, and lasts length samples.
+    """
+    offset: int
+    duration: float
+    frequencies: tuple
+    length: int
+
+
+class Timeline:
+    """
+    A performance in which every note, chord and rest is placed at an exact sample offset, and which is rendered
+    (mixing any overlapping sounds) into one stream of samples. Rests are just silence in the stream.
+
+    Sounds are added one after another from a cursor, or at an absolute time. The cursor is kept in seconds and each
+    offset is rounded from it, so timing is accurate to half a sample however long the performance is. Consecutive
+    notes with lengths in ticks at the same tempo are placed from their exact onsets in ticks (as Tone.render_melody
+    places them).
+    """
+
+    def __init__(self, tone: Tone = None):
+        self.tone = tone if tone is not None else Tone.default()
+        self.cursor = 0.0
+        self._events: List[TimelineEvent] = []
+        self._sorted = True
+        # notes added in ticks since the cursor was at a time: (tempo, start time, start offset, ticks, end time)
+        self._tick_run = None
+
+    def __repr__(self) -> str:
+        return f"Timeline<{len(self._events)},{self.duration}>"
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    @property
+    def events(self) -> List[TimelineEvent]:
+        """
+        The events of the timeline, ordered by offset.
+        """
+        if not self._sorted:
+            self._events.sort(key=lambda event: event.offset)
+            self._sorted = True
+        return self._events
+
+    @property
+    def num_samples(self) -> int:
+        """
+        The number of samples of the timeline, up to the end of its last sound or rest.
+        """
+        return max([self.offset(self.cursor)] + [event.offset + event.length for event in self._events])
+
+    @property
+    def duration(self) -> float:
+        return self.num_samples / self.tone.sample_rate
+
+    def offset(self, time: float) -> int:
+        """
+        Get the sample offset of a time (in seconds) of the timeline.
+        """
+        return int(round(time * self.tone.sample_rate))
+
+    def _append(self, event: TimelineEvent):
+        if self._events and event.offset < self._events[-1].offset:
+            self._sorted = False
+        self._events.append(event)
+
+    def _add(self, frequencies: tuple, duration: float, at: float = None) -> int:
+        start = self.cursor if at is None else at
+        offset = self.offset(start)
+        self._append(TimelineEvent(offset, duration, frequencies, num_samples(duration, self.tone.sample_rate)))
+
+        self.cursor = max(self.cursor, start + duration) if at is not None else start + duration
+        return offset
+
+    def _add_ticks(self, frequencies: tuple, duration: Duration) -> int:
+        tempo = (duration.bpm, duration.time_signature.beat_value)
+        run = self._tick_run
+        if run is None or run[0] != tempo or run[4] != self.cursor:
+            run = (tempo, self.cursor, self.offset(self.cursor), 0, self.cursor)
+        _, start, start_offset, ticks, _ = run
+
+        sample_rate = self.tone.sample_rate
+        offset = start_offset + int(samples_from_ticks(ticks, tempo[0], tempo[1], sample_rate))
+        ticks += duration.ticks
+        end_offset = start_offset + int(samples_from_ticks(ticks, tempo[0], tempo[1], sample_rate))
+        self._append(TimelineEvent(offset, duration.value, frequencies, end_offset - offset))
+
+        self.cursor = start + seconds_from_ticks(ticks, tempo[0], tempo[1])
+        self._tick_run = (tempo, start, start_offset, ticks, self.cursor)
+        return offset
+
+    def add_note(self, note: Union[float, Pitch, Note], duration: float = 1, at: float = None) -> int:
+        """
+        Add a note at the cursor (or at a time, in seconds), and get its sample offset.
+        """
+        if at is None and isinstance(note, Note) and note.duration.ticks is not None and note.duration.bpm \
+                and note.duration.time_signature:
+            return self._add_ticks((extract_frequency(note),), note.duration)
+        return self._add((extract_frequency(note),), extract_duration(note, duration), at)
+
+    def add_chord(self, chord: Iterable[Union[float, Pitch, Note]], duration: float = 1, at: float = None) -> int:
+        return self._add(tuple(extract_frequency(note) for note in chord), duration, at)
+
+    def add_rest(self, duration: float):
+        """
+        Move the cursor on by a duration of silence.
+        """
+        self.cursor += duration
+
+    def add_melody(self, notes: Iterable[Union[float, Pitch, Note]], duration: float = 1):
+        for note in notes:
+            self.add_note(note, duration)
+
+    def add_progression(self, chords: Iterable[Iterable[Union[float, Pitch, Note]]], duration: float = 1):
+        for chord in chords:
+            self.add_chord(chord, duration)
+
+    def add_track(self, track: Track, at: float = None):
+        """
+        Add the notes of a track at their onsets (after the cursor, or a time), so gaps between notes are rests.
+        """
+        start = self.cursor if at is None else at
+        for onset, duration, frequency in zip(track.onsets.tolist(), track.durations.tolist(),
+                                              track.frequencies.tolist()):
+            self._add((frequency,), duration, start + onset)
+        self.cursor = max(self.cursor, start + track.end)
+
+    def add_score(self, score: Score, at: float = None):
+        """
+        Add every track of a score, mixed together.
+        """
+        start = self.cursor if at is None else at
+        for track in score.tracks:
+            self.add_track(track, at=start)
+
+    def _wave(self, event: TimelineEvent) -> np.ndarray:
+        if len(event.frequencies) == 1:
+            return self.tone.wave_from_note(event.frequencies[0], event.duration, event.length)
+        return self.tone.wave_from_chord(list(event.frequencies), event.duration)
+
+    def stream(self, block_size: int = DEFAULT_BLOCK_SIZE) -> Generator[np.ndarray, None, None]:
+        """
+        Render the timeline as consecutive blocks of 16-bit PCM samples. Each sound is synthesized when the block it
+        starts in is rendered, so only the sounds playing during a block are held in memory.
+        """
+        events = self.events
+        length = self.num_samples
+        next_event = 0
+        playing = []
+
+        for block_start in range(0, length, block_size):
+            block_end = min(block_start + block_size, length)
+            while next_event < len(events) and events[next_event].offset < block_end:
+                event = events[next_event]
+                playing.append((event.offset, self._wave(event)))
+                next_event += 1
+
+            mix = np.zeros(block_end - block_start)
+            for offset, wave_ in playing:
+                start, end = max(offset, block_start), min(offset + len(wave_), block_end)
+                if end > start:
+                    mix[start - block_start:end - block_start] += wave_[start - offset:end - offset]
+
+            playing = [(offset, wave_) for offset, wave_ in playing if offset + len(wave_) > block_end]
+            yield pcm16_from_wave(np.clip(mix, -1, 1, out=mix))
+
+    def render(self, block_size: int = DEFAULT_BLOCK_SIZE) -> np.ndarray:
+        """
+        Render the whole timeline to 16-bit PCM samples.
+        """
+        pcm = np.empty(self.num_samples, dtype=np.int16)
+        offset = 0
+        for block in self.stream(block_size):
+            pcm[offset:offset + len(block)] = block
+            offset += len(block)
+        return pcm
+
+    def play(self, device=None):
+        """
+        Play the timeline, and return when it is done. The audio device is fed from a buffer rendered ahead of it, so
+        no thread sleeps between sounds (see playback.Playback).
+        """
+        from .playback import Playback
+
+        playback = Playback(self.tone, device)
+        playback.start(self)
+        try:
+            playback.wait()
+        finally:
+            playback.stop()
@@ -1,27 +1,52 @@
+import queue
+import threading
 import time
-from typing import List, Union
-from .notes import Note, Duration
-from .pitches import Pitch
-from .utils import composer_root_directory
+import wave
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from multiprocessing.shared_memory import SharedMemory
+from typing import List, Union, Iterable, Generator, Callable, Hashable, Sequence, Any
+from .notes import Note, Duration, TempoMap, TICKS_PER_QUARTER, onset_ticks, samples_from_ticks
+from .pitches import Pitch, midi_numbers_from_frequencies
+from .utils import composer_root_directory, default_instance_method
 from .scales import ScaleBuilder
 
 from .intervals import EqualTemperament12
+from .additive import additive_wave
+from .wavetables import shared_wavetable
+from .scores import Track
+from .midi import write_midi_tracks, quarter_note_bpm, DEFAULT_BPM
 
-from synthesizer import Player, Synthesizer, Waveform, Writer
+from synthesizer import Player, Synthesizer, Oscillator, Waveform
 import numpy as np
 import os
 
-from midiutil import MIDIFile
 
-# TODO: extend this class and make it subclass-able. Each will be instantiated with an instrument name/waveform
-#   This way we can have something like PianoTone = Tone(instrument='piano'), etc, and then
-#   the class will instantiate a synthesizer that uses a piano tone.
+# TODO: instantiate tones with an instrument name, e.g. PianoTone = Tone(instrument='piano'), with a synthesizer
+#   that uses a piano tone.
 # TODO: move these to an outside utility file?
 
 OUT_DIR = "out"
 WAV_OUT_DIR = f"{OUT_DIR}/wav"
 MIDI_OUT_DIR = f"{OUT_DIR}/midi"
 
+SAMPLE_RATE = 44100
+PCM16_SCALE = float(2 ** 15 - 1)
+DEFAULT_BLOCK_SIZE = 8192
+DEFAULT_WAVEFORM_CACHE_BYTES = 64 * 2 ** 20
+
+# Number of sounds rendered ahead of the one playing, during live playback
+DEFAULT_LOOKAHEAD = 8
+
+# Number of time segments the sound is split into per process when rendering in parallel, so that the processes
+# stay busy even when some segments take longer to synthesize than others
+SEGMENTS_PER_PROCESS = 4
+
+# Chords of sines with at least this many notes are synthesized in the frequency domain (see additive_wave)
+ADDITIVE_MIN_PARTIALS = 8
+
 
 def extract_frequency(o: Union[float, Pitch, Note]):
     return o if isinstance(o, float) or isinstance(o, int) \
@@ -36,124 +61,676 @@ def extract_duration(o: Union[float, Duration, Note], default: float = None):
         else default
 
 
+def num_samples(duration: float, sample_rate: int = SAMPLE_RATE) -> int:
+    """
+    Get the number of samples the synthesizer generates for a duration (in seconds).
+    """
+    return int(sample_rate * float(duration))
+
+
+def notes_with_lengths(notes: Iterable[Union[float, Pitch, Note]], duration: float = 1,
+                       sample_rate: int = SAMPLE_RATE) -> Generator[tuple, None, None]:
+    """
+    Pair each note of a melody with its number of samples, lazily. Consecutive notes with lengths in ticks at the same
+    tempo each end at the sample nearest to their exact end (see samples_from_ticks), so they don't drift from their
+    MIDI timing. Other notes have as many samples as the synthesizer generates for their duration.
+    """
+    tempo = None
+    run_ticks = run_samples = 0
+    for note in notes:
+        _duration = note.duration if isinstance(note, Note) else None
+        if _duration is not None and _duration.ticks is not None and _duration.bpm and _duration.time_signature:
+            note_tempo = (_duration.bpm, _duration.time_signature.beat_value)
+            if note_tempo != tempo:
+                tempo = note_tempo
+                run_ticks = run_samples = 0
+            run_ticks += _duration.ticks
+            end = int(samples_from_ticks(run_ticks, tempo[0], tempo[1], sample_rate))
+            yield note, end - run_samples
+            run_samples = end
+        else:
+            tempo = None
+            yield note, num_samples(extract_duration(note, duration), sample_rate)
+
+
+def pcm16_from_wave(wave_: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    Convert a normalized wave to 16-bit PCM samples (like the synthesizer's Writer), optionally into an existing array.
+    """
+    if out is None:
+        return (wave_ * PCM16_SCALE).astype(np.int16)
+
+    out[:] = wave_ * PCM16_SCALE
+    return out
+
+
+def open_pcm16_wav(file_path: str, sample_rate: int = SAMPLE_RATE) -> wave.Wave_write:
+    """
+    Open a 16-bit mono wav file for writing. Frames may be written incrementally, and the RIFF header sizes are
+    patched when the file is closed.
+    """
+    wav_file = wave.open(file_path, 'wb')
+    wav_file.setnchannels(1)
+    wav_file.setsampwidth(2)
+    wav_file.setframerate(sample_rate)
+    return wav_file
+
+
+def write_pcm16_wav(file_path: str, pcm: np.ndarray, sample_rate: int = SAMPLE_RATE):
+    """
+    Write 16-bit mono PCM samples to a wav file.
+    """
+    with open_pcm16_wav(file_path, sample_rate) as wav_file:
+        wav_file.writeframes(np.ascontiguousarray(pcm, dtype=np.int16))
+
+
 def ensure_out_directory_exists(directory: str):
     if not os.path.exists(f"{composer_root_directory}/{directory}"):
         os.makedirs(f"{composer_root_directory}/{directory}")
 
 
 def wav_out_file_path(filename: str):
+    """
+    Get the path of a wav file in the output directory. Absolute paths are used as they are.
+    """
     ensure_out_directory_exists(WAV_OUT_DIR)
-    return f"{composer_root_directory}/{WAV_OUT_DIR}/{filename}"
+    return os.path.join(composer_root_directory, WAV_OUT_DIR, filename)
 
 
 def midi_out_file_path(filename: str):
+    """
+    Get the path of a midi file in the output directory. Absolute paths are used as they are.
+    """
     ensure_out_directory_exists(MIDI_OUT_DIR)
-    return f"{composer_root_directory}/{MIDI_OUT_DIR}/{filename}"
+    return os.path.join(composer_root_directory, MIDI_OUT_DIR, filename)
+
+
+def phase_continuous_wave(frequencies: Iterable[float], lengths: Iterable[int], waveform: Waveform = Waveform.sine,
+                          sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """
+    Synthesize a sequence of notes (a frequency and number of samples for each) in one vectorized pass.
+    The per-sample phase increments are integrated with a single cumulative sum, so the phase carries over from
+    each note to the next and there are no discontinuities at note boundaries.
+    """
+    phase_steps = 2.0 * np.pi * np.asarray(frequencies, dtype=float) / sample_rate
+    phases = np.repeat(phase_steps, np.asarray(lengths, dtype=np.int64))
+    np.cumsum(phases, out=phases)
+
+    if waveform is Waveform.sine:
+        return np.sin(phases, out=phases)
+    return Oscillator(waveform=waveform, volume=1.0).generate_wave(phases)
+
+
+def segment_bounds(lengths: Sequence[int], num_segments: int) -> List[tuple]:
+    """
+    Split a sequence of sounds (the number of samples of each) into at most num_segments contiguous (start, end)
+    index ranges with about the same total number of samples.
+    """
+    ends = np.cumsum(np.asarray(lengths, dtype=np.int64))
+    if not len(ends):
+        return []
+
+    targets = ends[-1] * np.arange(1, num_segments) / num_segments
+    boundaries = np.unique(np.concatenate(([0], np.searchsorted(ends, targets) + 1, [len(ends)])))
+    return [(int(start), int(end)) for start, end in zip(boundaries[:-1], boundaries[1:]) if end > start]
+
+
+@contextmanager
+def shared_pcm16(size: int) -> Generator[tuple, None, None]:
+    """
+    Allocate 16-bit PCM samples in shared memory, which other processes can write into by name (see render_segment).
+    Yields the name and the samples, and releases the memory on exit.
+    """
+    shared_memory = SharedMemory(create=True, size=max(2 * size, 1))
+    try:
+        pcm = np.ndarray(size, dtype=np.int16, buffer=shared_memory.buf)
+        yield shared_memory.name, pcm
+        del pcm
+    finally:
+        shared_memory.close()
+        shared_memory.unlink()
+
+
+@lru_cache(maxsize=None)
+def _process_tone(tone_class: type, waveform: Waveform, sample_rate: int, band_limited: bool) -> 'Tone':
+    return tone_class(waveform=waveform, sample_rate=sample_rate, band_limited=band_limited)
+
+
+def render_segment(shared_memory_name: str, size: int, tone_args: tuple, chords: bool, sounds: list,
+                   durations: list, offsets: list, lengths: list):
+    """
+    Render notes (frequencies) or chords (lists of frequencies) into their slices of the 16-bit PCM samples in shared
+    memory, with a tone of the process created from tone_args.
+    """
+    tone = _process_tone(*tone_args)
+    shared_memory = SharedMemory(name=shared_memory_name)
+    try:
+        pcm = np.ndarray(size, dtype=np.int16, buffer=shared_memory.buf)
+        for sound, duration, offset, length in zip(sounds, durations, offsets, lengths):
+            wave_ = tone.wave_from_chord(sound, duration) if chords else tone.wave_from_note(sound, duration, length)
+            pcm16_from_wave(wave_, out=pcm[offset:offset + length])
+        del pcm
+    finally:
+        shared_memory.close()
+
+
+class _RenderFailure:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_END_OF_SOUNDS = object()
+
+
+class LookaheadRenderer:
+    """
+    Renders a sequence of sounds in a background thread, up to `lookahead` sounds ahead of the consumer iterating over
+    the waves. The bounded queue between them makes the renderer wait when it is far enough ahead.
+
+    An underrun is counted whenever the consumer asks for the next wave (after the first) before it is rendered.
+    Errors raised while rendering are raised to the consumer.
+    """
+
+    def __init__(self, render: Callable[[Any], np.ndarray], sounds: Iterable[Any],
+                 lookahead: int = DEFAULT_LOOKAHEAD):
+        self.underruns = 0
+        self._queue = queue.Queue(maxsize=max(1, lookahead))
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(render, sounds), daemon=True)
+        self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _run(self, render: Callable[[Any], np.ndarray], sounds: Iterable[Any]):
+        try:
+            for sound in sounds:
+                if not self._put(render(sound)):
+                    return
+        except Exception as error:
+            self._put(_RenderFailure(error))
+            return
+        self._put(_END_OF_SOUNDS)
+
+    def __iter__(self) -> Generator[np.ndarray, None, None]:
+        try:
+            first = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    item = self._queue.get()
+                    if not first and item is not _END_OF_SOUNDS:
+                        self.underruns += 1
+
+                if item is _END_OF_SOUNDS:
+                    return
+                if isinstance(item, _RenderFailure):
+                    raise item.error
+
+                first = False
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stop rendering.
+        """
+        self._stopped.set()
+        self._thread.join()
+
+
+class WaveformCache:
+    """
+    A least-recently-used cache of rendered waves, bounded by the total size (in bytes) of the waves it holds.
+    Cached waves are made read-only since they are shared by every caller rendering the same sound.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_WAVEFORM_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._waves = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"WaveformCache<{len(self)},{self.size_bytes}/{self.max_bytes},hits={self.hits},misses={self.misses}>"
+
+    def __len__(self) -> int:
+        return len(self._waves)
+
+    def get(self, key: Hashable, generate: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Get the cached wave for a key, or generate and cache it. Waves larger than the cache are not stored.
+        """
+        with self._lock:
+            wave_ = self._waves.get(key)
+            if wave_ is not None:
+                self._waves.move_to_end(key)
+                self.hits += 1
+                return wave_
+            self.misses += 1
+
+        wave_ = generate()
+        wave_.flags.writeable = False
+
+        if wave_.nbytes > self.max_bytes:
+            return wave_
+
+        with self._lock:
+            if key not in self._waves:
+                self._waves[key] = wave_
+                self.size_bytes += wave_.nbytes
+
+            while self.size_bytes > self.max_bytes:
+                _, evicted = self._waves.popitem(last=False)
+                self.size_bytes -= evicted.nbytes
+
+        return wave_
+
+    def clear(self):
+        with self._lock:
+            self._waves.clear()
+            self.size_bytes = 0
 
 
 class Tone:
-    player = Player()
-    synthesizer = Synthesizer(osc1_waveform=Waveform.sine,
-                              osc1_volume=1.0, use_osc2=False)
-    writer = Writer()
-
-    is_stream_open = False
+    """
+    A renderer of notes, chords and melodies with one waveform and sample rate.
+
+    Each instance owns its synthesis state (synthesizer, waveform cache and audio output), so separate instances may
+    render and play concurrently from different threads. Methods may also be called on the class itself, which uses a
+    default instance of it (e.g. Tone.play_note(440) or SquareTone.write_wav_melody(...)).
+    """
+
+    # default waveform of the instances of the class
+    waveform = Waveform.sine
+
+    _default_lock = threading.Lock()
+
+    def __init__(self,
+                 waveform: Waveform = None,
+                 sample_rate: int = SAMPLE_RATE,
+                 band_limited: bool = True,
+                 waveform_cache: WaveformCache = None):
+        """
+        With band_limited, non-sine waveforms are rendered from (non-aliasing) wavetables instead of the synthesizer.
+        A waveform cache may be shared by several instances.
+        """
+        self.waveform = waveform if waveform is not None else type(self).waveform
+        self.sample_rate = sample_rate
+        self.synthesizer = Synthesizer(osc1_waveform=self.waveform,
+                                       osc1_volume=1.0, use_osc2=False, rate=sample_rate)
+        self.oscillator = Oscillator(waveform=self.waveform, volume=1.0)
+        self.wavetable = shared_wavetable(self.waveform, sample_rate) \
+            if band_limited and self.waveform is not Waveform.sine else None
+        self.waveform_cache = waveform_cache
+
+        self._player = None
+        self._player_lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}<{self.waveform.value},{self.sample_rate}>"
 
     @classmethod
-    def _ensure_stream_open(cls):
-        if not cls.is_stream_open:
-            cls.player.open_stream()
-            cls.is_stream_open = True
-
-    @classmethod
-    def wave_from_note(cls, note: Union[float, Pitch, Note] = None, duration: float = 1):
+    def default(cls) -> 'Tone':
+        """
+        Get the instance of the class that methods called on the class are run on, creating it on first use.
+        """
+        default = cls.__dict__.get('_default')
+        if default is None:
+            with Tone._default_lock:
+                default = cls.__dict__.get('_default')
+                if default is None:
+                    default = cls()
+                    cls._default = default
+        return default
+
+    @property
+    def player(self) -> Player:
+        """
+        The audio output of the instance, opened on first use.
+        """
+        with self._player_lock:
+            if self._player is None:
+                player = Player(rate=self.sample_rate)
+                player.open_stream()
+                self._player = player
+            return self._player
+
+    @default_instance_method
+    def _play_wave(self, wave_: np.ndarray):
+        player = self.player
+        with self._player_lock:
+            player.play_wave(wave_)
+
+    @default_instance_method
+    def enable_waveform_cache(self, max_bytes: int = DEFAULT_WAVEFORM_CACHE_BYTES) -> WaveformCache:
+        """
+        Cache rendered note and chord waves (up to max_bytes), so that repeated sounds are only synthesized once.
+        Waves returned from the cache are read-only.
+        """
+        self.waveform_cache = WaveformCache(max_bytes)
+        return self.waveform_cache
+
+    @default_instance_method
+    def disable_waveform_cache(self):
+        self.waveform_cache = None
+
+    @default_instance_method
+    def _cached_wave(self, frequencies: tuple, duration: float, generate: Callable[[], np.ndarray],
+                     length: int = None) -> np.ndarray:
+        waveform_cache = self.waveform_cache
+        if waveform_cache is None:
+            return generate()
+
+        key = (frequencies, float(duration), length, self.waveform, self.sample_rate, self.wavetable is not None)
+        return waveform_cache.get(key, generate)
+
+    @default_instance_method
+    def _constant_wave(self, frequency: float, duration: float, length: int = None) -> np.ndarray:
+        length = length if length is not None else num_samples(duration, self.sample_rate)
+        if self.wavetable is not None:
+            return self.wavetable.render(frequency, length)
+        # the phases of the synthesizer's generate_constant_wave, for any number of samples
+        return self.oscillator.generate_wave(np.cumsum(2.0 * np.pi * frequency / self.sample_rate * np.ones(length)))
+
+    @default_instance_method
+    def wave_from_note(self, note: Union[float, Pitch, Note] = None, duration: float = 1, length: int = None):
+        """
+        Synthesize a note, by default for as many samples as its duration takes (or for `length` samples).
+        """
         _frequency = extract_frequency(note)
         _duration = extract_duration(note, duration)
-        return cls.synthesizer.generate_constant_wave(_frequency, _duration)
+        return self._cached_wave((_frequency,), _duration, lambda: self._constant_wave(_frequency, _duration, length),
+                                 length)
 
-    @classmethod
-    def wave_from_chord(cls, chord: List[Union[float, Pitch, Note]] = None, duration: float = 1):
+    @default_instance_method
+    def wave_from_chord(self, chord: List[Union[float, Pitch, Note]] = None, duration: float = 1):
         _frequencies = [extract_frequency(note) for note in chord]
-        return cls.synthesizer.generate_chord(_frequencies, duration)
-
-    @classmethod
-    def play_note(cls, note: Union[float, Pitch, Note] = None, duration: float = 1):
-        wave = cls.wave_from_note(note, duration)
-        cls._ensure_stream_open()
-        cls.player.play_wave(wave)
 
-    @classmethod
-    def play_chord(cls, chord: List[Union[float, Pitch, Note]] = None, duration: float = 1):
-        wave = cls.wave_from_chord(chord, duration)
-        cls._ensure_stream_open()
-        cls.player.play_wave(wave)
-
-    @classmethod
-    def play_melody(cls, notes: List[Union[float, Pitch, Note]] = None, duration: float = 1):
-        for note in notes:
-            cls.play_note(note, duration)
-
-    @classmethod
-    def play_progression(cls, chords: List[List[Union[float, Pitch, Note]]] = None, duration: float = 1):
-        for chord in chords:
-            cls.play_chord(chord, duration)
-
-    @classmethod
-    def rest(cls, duration=0.005):
+        if self.waveform is Waveform.sine and len(_frequencies) >= ADDITIVE_MIN_PARTIALS:
+            return self.wave_from_partials(_frequencies, duration=duration)
+
+        if self.wavetable is not None:
+            return self._cached_wave(tuple(_frequencies), duration,
+                                     lambda: sum(self._constant_wave(frequency, duration)
+                                                 for frequency in _frequencies) / len(_frequencies))
+
+        return self._cached_wave(tuple(_frequencies), duration,
+                                 lambda: self.synthesizer.generate_chord(_frequencies, duration))
+
+    @default_instance_method
+    def wave_from_partials(self, partials: List[Union[float, Pitch, Note]], amplitudes: List[float] = None,
+                           duration: float = 1):
+        """
+        Synthesize a sum of sine partials (by default equally loud) with the additive (inverse FFT) engine, whose cost
+        barely grows with the number of partials.
+        """
+        _frequencies = tuple(extract_frequency(partial) for partial in partials)
+        _amplitudes = tuple(amplitudes) if amplitudes is not None else None
+        return self._cached_wave((_frequencies, _amplitudes), duration,
+                                 lambda: additive_wave(_frequencies, duration, _amplitudes, self.sample_rate))
+
+    @default_instance_method
+    def wave_from_melody(self, notes: Iterable[Union[float, Pitch, Note]] = None, duration: float = 1):
+        """
+        Synthesize a whole melody as one phase-continuous wave.
+        """
+        notes_lengths = list(notes_with_lengths(notes, duration, self.sample_rate))
+        frequencies = [extract_frequency(note) for note, _ in notes_lengths]
+        lengths = [length for _, length in notes_lengths]
+        if self.wavetable is not None:
+            return self.wavetable.render_melody(frequencies, lengths)
+        return phase_continuous_wave(frequencies, lengths, self.waveform, self.sample_rate)
+
+    @default_instance_method
+    def play_note(self, note: Union[float, Pitch, Note] = None, duration: float = 1):
+        self._play_wave(self.wave_from_note(note, duration))
+
+    @default_instance_method
+    def play_chord(self, chord: List[Union[float, Pitch, Note]] = None, duration: float = 1):
+        self._play_wave(self.wave_from_chord(chord, duration))
+
+    @default_instance_method
+    def play_melody(self, notes: List[Union[float, Pitch, Note]] = None, duration: float = 1,
+                    lookahead: int = DEFAULT_LOOKAHEAD) -> int:
+        """
+        Play a melody, rendering up to `lookahead` notes ahead (in a background thread) while a note plays, so that
+        synthesis doesn't add gaps between notes. Returns the number of underruns, i.e. of notes that weren't rendered
+        in time.
+        """
+        renderer = LookaheadRenderer(lambda note_length: self.wave_from_note(note_length[0], duration, note_length[1]),
+                                     notes_with_lengths(notes, duration, self.sample_rate), lookahead)
+        for wave_ in renderer:
+            self._play_wave(wave_)
+        return renderer.underruns
+
+    @default_instance_method
+    def play_progression(self, chords: List[List[Union[float, Pitch, Note]]] = None, duration: float = 1,
+                         lookahead: int = DEFAULT_LOOKAHEAD) -> int:
+        """
+        Play a progression, rendering up to `lookahead` chords ahead while a chord plays (see play_melody).
+        """
+        renderer = LookaheadRenderer(lambda chord: self.wave_from_chord(chord, duration), chords, lookahead)
+        for wave_ in renderer:
+            self._play_wave(wave_)
+        return renderer.underruns
+
+    @default_instance_method
+    async def play(self, notes: Iterable[Union[float, Pitch, Note]] = None, duration: float = 1, device=None):
+        """
+        Play a melody in the background without blocking the event loop, e.g. await Tone.play(notes). The melody is
+        rendered ahead of a callback-driven audio device (see playback.Playback, which can also pause and resume).
+        """
+        from .playback import Playback
+        await Playback(self, device).play(notes, duration)
+
+    @staticmethod
+    def rest(duration=0.005):
         time.sleep(duration)
 
-    @classmethod
-    def write_wav_melody(cls, filename: str, notes: List[Union[float, Pitch, Note]] = None, duration: float = 1):
+    @contextmanager
+    def _render_in_parallel(self, sounds: List, duration: float, processes: int,
+                            chords: bool = False) -> Generator[np.ndarray, None, None]:
+        """
+        Render notes (or chords) into 16-bit PCM samples in shared memory, split into time segments that a pool of
+        processes renders concurrently. Each sound is synthesized exactly as by the serial renderers, so the output is
+        identical. The samples are only valid within the context.
+        """
+        if chords:
+            sounds = [[extract_frequency(note) for note in chord] for chord in sounds]
+            durations = [duration] * len(sounds)
+            lengths = [num_samples(duration, self.sample_rate)] * len(sounds)
+        else:
+            lengths = [length for _, length in notes_with_lengths(sounds, duration, self.sample_rate)]
+            durations = [extract_duration(note, duration) for note in sounds]
+            sounds = [extract_frequency(note) for note in sounds]
+
+        offsets = np.concatenate(([0], np.cumsum(lengths)[:-1])).astype(np.int64).tolist() if lengths else []
+        size = sum(lengths)
+        tone_args = (type(self), self.waveform, self.sample_rate, self.wavetable is not None)
+
+        with shared_pcm16(size) as (shared_memory_name, pcm):
+            with ProcessPoolExecutor(max_workers=processes) as executor:
+                futures = [executor.submit(render_segment, shared_memory_name, size, tone_args, chords,
+                                           sounds[start:end], durations[start:end], offsets[start:end],
+                                           lengths[start:end])
+                           for start, end in segment_bounds(lengths, processes * SEGMENTS_PER_PROCESS)]
+                for future in futures:
+                    future.result()
+
+            yield pcm
+
+    @default_instance_method
+    def render_melody(self, notes: Iterable[Union[float, Pitch, Note]] = None, duration: float = 1,
+                      phase_continuous: bool = False, processes: int = None) -> np.ndarray:
+        """
+        Render a melody to 16-bit PCM samples. The output is allocated once, and each note is written into its slice.
+        With phase_continuous, the melody is synthesized in one pass without restarting the phase of each note.
+        With processes, notes are rendered in parallel by that many processes (see _render_in_parallel).
+        """
+        if phase_continuous:
+            if processes:
+                raise ValueError("phase-continuous melodies are synthesized in one pass, and can't be parallelized")
+            return pcm16_from_wave(self.wave_from_melody(notes, duration))
+
+        notes = list(notes)
+        if processes:
+            with self._render_in_parallel(notes, duration, processes) as pcm:
+                return pcm.copy()
+
+        notes_lengths = list(notes_with_lengths(notes, duration, self.sample_rate))
+        pcm = np.empty(sum(length for _, length in notes_lengths), dtype=np.int16)
+
+        offset = 0
+        for note, length in notes_lengths:
+            pcm16_from_wave(self.wave_from_note(note, duration, length), out=pcm[offset:offset + length])
+            offset += length
+
+        return pcm
+
+    @default_instance_method
+    def render_progression(self, chords: Iterable[List[Union[float, Pitch, Note]]] = None,
+                           duration: float = 1, processes: int = None) -> np.ndarray:
+        """
+        Render a progression to 16-bit PCM samples. The output is allocated once, and each chord is written into its
+        slice. With processes, chords are rendered in parallel by that many processes.
+        """
+        chords = list(chords)
+        if processes:
+            with self._render_in_parallel(chords, duration, processes, chords=True) as pcm:
+                return pcm.copy()
+
+        length = num_samples(duration, self.sample_rate)
+        pcm = np.empty(length * len(chords), dtype=np.int16)
+
+        for idx, chord in enumerate(chords):
+            pcm16_from_wave(self.wave_from_chord(chord, duration), out=pcm[idx * length:(idx + 1) * length])
+
+        return pcm
+
+    @default_instance_method
+    def stream_melody(self, notes: Iterable[Union[float, Pitch, Note]] = None, duration: float = 1,
+                      block_size: int = DEFAULT_BLOCK_SIZE) -> Generator[np.ndarray, None, None]:
+        """
+        Render a melody as consecutive blocks of 16-bit PCM samples, synthesizing notes (even long ones) a block at a
+        time. Every block but the last has block_size samples. Notes are only read from the iterable as they are
+        needed, so it may be a generator.
+        """
+        block = np.empty(block_size, dtype=np.int16)
+        filled = 0
+
+        for note, length in notes_with_lengths(notes, duration, self.sample_rate):
+            frequency = extract_frequency(note)
+            phase_step = 2.0 * np.pi * frequency / self.sample_rate
+
+            start = 0
+            while start < length:
+                size = min(length - start, block_size - filled)
+                if self.wavetable is not None:
+                    wave_ = self.wavetable.render(frequency, size, phase=start * frequency / self.sample_rate)
+                else:
+                    wave_ = self.oscillator.generate_wave(phase_step * np.arange(start + 1, start + size + 1))
+                pcm16_from_wave(wave_, out=block[filled:filled + size])
+                filled += size
+                start += size
+
+                if filled == block_size:
+                    yield block
+                    block = np.empty(block_size, dtype=np.int16)
+                    filled = 0
+
+        if filled:
+            yield block[:filled]
+
+    @default_instance_method
+    def stream_wav_melody(self, filename: str, notes: Iterable[Union[float, Pitch, Note]] = None,
+                          duration: float = 1, block_size: int = DEFAULT_BLOCK_SIZE):
+        """
+        Write a melody of any length to a wav file, keeping only about one block of samples in memory at a time.
+        """
         file_path = wav_out_file_path(filename)
-        melody_wav = np.concatenate(
-            [cls.wave_from_note(note, duration) for note in notes])
-        cls.writer.write_wave(file_path, melody_wav)
+        with open_pcm16_wav(file_path, self.sample_rate) as wav_file:
+            for block in self.stream_melody(notes, duration, block_size):
+                wav_file.writeframes(block)
 
-    @classmethod
-    def write_wav_progression(cls, filename: str, chords: List[List[Union[float, Pitch, Note]]] = None,
-                              duration: float = 1):
+    @default_instance_method
+    def write_wav_melody(self, filename: str, notes: List[Union[float, Pitch, Note]] = None, duration: float = 1,
+                         phase_continuous: bool = False, processes: int = None):
         file_path = wav_out_file_path(filename)
-        progression_wav = np.concatenate(
-            [cls.wave_from_chord(chord, duration) for chord in chords])
-        cls.writer.write_wave(file_path, progression_wav)
+        if processes and not phase_continuous:
+            with self._render_in_parallel(list(notes), duration, processes) as pcm:
+                write_pcm16_wav(file_path, pcm, self.sample_rate)
+            return
 
-    @classmethod
-    def write_midi_melody(cls, filename: str, notes: List[Union[float, Pitch, Note]], duration: float = 1):
-        volume = 110  # range: 0-127
-        melody_track = 0
-        melody_channel = 0
+        # phase-continuous melodies can't be rendered in parallel, which render_melody raises for
+        write_pcm16_wav(file_path, self.render_melody(notes, duration, phase_continuous, processes), self.sample_rate)
 
-        # TODO: have a Song object, on which we can attach time_signature and bpm information for a song
-        #  and then extract for use here. Durations already provide the absolute value of time for us.
+    @default_instance_method
+    def write_wav_progression(self, filename: str, chords: List[List[Union[float, Pitch, Note]]] = None,
+                              duration: float = 1, processes: int = None):
+        file_path = wav_out_file_path(filename)
+        if processes:
+            with self._render_in_parallel(list(chords), duration, processes, chords=True) as pcm:
+                write_pcm16_wav(file_path, pcm, self.sample_rate)
+            return
+
+        write_pcm16_wav(file_path, self.render_progression(chords, duration), self.sample_rate)
+
+    @staticmethod
+    def write_midi_melody(filename: str, notes: List[Union[float, Pitch, Note]], duration: float = 1):
+        """
+        Write a melody to a MIDI file, at the tempo of its notes' durations (with a tempo event wherever it changes).
+        Onsets are summed in integer ticks, so they don't drift over long melodies.
+        """
+        ticks = []
+        tempo_changes = []
+        frequencies = []
+        midi_numbers = []
+
+        tick = 0
+        for note in notes:
+            if isinstance(note, Note) and note.duration.ticks is not None and note.duration.bpm:
+                bpm = quarter_note_bpm(note.duration.bpm, note.duration.time_signature)
+                note_ticks = note.duration.ticks
+            else:
+                bpm = tempo_changes[-1][1] if tempo_changes else DEFAULT_BPM
+                note_ticks = round(extract_duration(note, duration) * bpm / 60 * TICKS_PER_QUARTER)
+            if not tempo_changes or tempo_changes[-1][1] != bpm:
+                tempo_changes.append((tick / TICKS_PER_QUARTER, bpm))
 
-        midi = MIDIFile(numTracks=1)
+            ticks.append(note_ticks)
+            frequencies.append(extract_frequency(note))
+            midi_numbers.append(note.pitch.midi_number if isinstance(note, Note)
+                                else float(midi_numbers_from_frequencies(extract_frequency(note))))
+            tick += note_ticks
 
-        time_marker = 0
-        for note in notes:
-            _duration = extract_duration(note, duration)
-            _pitch = int(note.pitch.midi_number)
+        tempo_map = TempoMap(tempo_changes) if tempo_changes else TempoMap.constant(DEFAULT_BPM)
+        onsets = onset_ticks(ticks)
+        track = Track.from_beats(onsets / TICKS_PER_QUARTER, np.asarray(ticks) / TICKS_PER_QUARTER, frequencies,
+                                 tempo_map, name="Melody", midi_numbers=midi_numbers)
+        write_midi_tracks(midi_out_file_path(filename), [track], tempo_map)
 
-            if note.duration.bpm:
-                # TODO: debug whether this has any effect on output midi file
-                midi.addTempo(track=melody_track, time=time_marker,
-                              tempo=note.duration.bpm)
-            else:
-                midi.addTempo(track=melody_track, time=time_marker,
-                              tempo=60)
 
-            midi.addNote(track=melody_track,
-                         time=time_marker,
-                         pitch=_pitch,
-                         duration=_duration,
-                         volume=volume,
-                         channel=melody_channel)
+class SawtoothTone(Tone):
+    waveform = Waveform.sawtooth
+
 
-            time_marker = time_marker + note.duration.value
+class SquareTone(Tone):
+    waveform = Waveform.square
 
-        filepath = midi_out_file_path(filename)
 
-        with open(filepath, "wb") as output_file:
-            midi.writeFile(output_file)
+class TriangleTone(Tone):
+    waveform = Waveform.triangle
 
 
 if __name__ == '__main__':
@@ -1,5 +1,7 @@
 from typing import List, Any
+import functools
 import random
+import types
 import time
 import os
 
@@ -48,6 +50,20 @@ def filename_timestamp():
     return time.strftime("_%Y-%m-%d_%H-%M-%S")
 
 
+class default_instance_method:
+    """
+    Decorator for an instance method that may also be called on the class itself, in which case it is called on the
+    default instance of the class, as returned by its `default()` classmethod.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        functools.update_wrapper(self, method)
+
+    def __get__(self, instance, owner=None):
+        return types.MethodType(self.method, instance if instance is not None else owner.default())
+
+
 def get_root_directory():
     """
     Gets the root directory of the project.
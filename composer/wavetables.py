@@ -0,0 +1,120 @@
+from functools import lru_cache
+from typing import Iterable
+
+import numpy as np
+from synthesizer import Waveform
+
+TABLE_SIZE = 2048
+
+# Fundamental frequency up to which the first (brightest) table of a wavetable is used
+LOWEST_TABLE_FREQUENCY = 20.0
+
+
+def harmonic_amplitudes(waveform: Waveform, num_harmonics: int):
+    """
+    Get the Fourier series (sine and cosine amplitudes of harmonics 1..num_harmonics) of a waveform, with the same
+    shape and phase as the synthesizer's oscillators.
+    """
+    harmonics = np.arange(1, num_harmonics + 1)
+    odd = harmonics % 2 == 1
+    sines = np.zeros(num_harmonics)
+    cosines = np.zeros(num_harmonics)
+
+    if waveform is Waveform.sine:
+        sines[0] = 1
+    elif waveform is Waveform.sawtooth:
+        # rises from -1 to 1 over a cycle
+        sines[:] = -2 / (np.pi * harmonics)
+    elif waveform is Waveform.square:
+        # 1 for the first half of a cycle, -1 for the second
+        sines[odd] = 4 / (np.pi * harmonics[odd])
+    elif waveform is Waveform.triangle:
+        # rises from -1 to 1 over the first half of a cycle, and falls back over the second
+        cosines[odd] = -8 / (np.pi * harmonics[odd]) ** 2
+    else:
+        raise TypeError(f"unknown waveform: {waveform}")
+
+    return sines, cosines
+
+
+class Wavetable:
+    """
+    Band-limited single-cycle tables of a waveform, one per octave of fundamental frequency (a mipmap).
+
+    The table for a note only has the harmonics that fit below the Nyquist frequency, so rendering by table lookup
+    does not alias, at close to the cost of a sine.
+    """
+
+    def __init__(self,
+                 waveform: Waveform,
+                 sample_rate: int = 44100,
+                 table_size: int = TABLE_SIZE,
+                 lowest_frequency: float = LOWEST_TABLE_FREQUENCY):
+        self.waveform = waveform
+        self.sample_rate = sample_rate
+        self.table_size = table_size
+        self.lowest_frequency = lowest_frequency
+
+        nyquist = sample_rate / 2
+        num_tables = max(1, int(np.ceil(np.log2(nyquist / lowest_frequency))))
+
+        # table k is used for fundamentals up to lowest_frequency * 2 ** k, and has their harmonics below nyquist
+        tables = np.zeros((num_tables, table_size + 1))
+        for k in range(num_tables):
+            num_harmonics = int(nyquist // (lowest_frequency * 2 ** k))
+            num_harmonics = max(1, min(num_harmonics, table_size // 2 - 1))
+            sines, cosines = harmonic_amplitudes(waveform, num_harmonics)
+
+            spectrum = np.zeros(table_size // 2 + 1, dtype=complex)
+            spectrum[1:num_harmonics + 1] = (table_size / 2) * (cosines - 1j * sines)
+            tables[k, :table_size] = np.fft.irfft(spectrum, table_size)
+
+        # guard sample for interpolating past the end of a cycle
+        tables[:, table_size] = tables[:, 0]
+
+        # band-limited waves overshoot (e.g. the Gibbs phenomenon at edges), so tables are scaled to stay normalized
+        self.tables = tables / np.maximum(1.0, np.abs(tables).max(axis=1))[:, np.newaxis]
+
+    def __repr__(self) -> str:
+        return f"Wavetable<{self.waveform},{len(self.tables)}>"
+
+    def table_indexes(self, frequencies: np.ndarray) -> np.ndarray:
+        """
+        Get the index of the table to render each fundamental frequency with.
+        """
+        octaves = np.ceil(np.log2(np.maximum(np.asarray(frequencies, dtype=float), 1e-9) / self.lowest_frequency))
+        return np.clip(octaves, 0, len(self.tables) - 1).astype(np.int64)
+
+    def _lookup(self, table_indexes, cycles: np.ndarray) -> np.ndarray:
+        positions = (cycles % 1.0) * self.table_size
+        lower = positions.astype(np.int64)
+        fraction = positions - lower
+        return self.tables[table_indexes, lower] * (1 - fraction) + self.tables[table_indexes, lower + 1] * fraction
+
+    def render(self, frequency: float, num_samples: int, phase: float = 0) -> np.ndarray:
+        """
+        Render a note of constant frequency. The phase (in cycles) is that of the sample before the first one, which
+        (like the synthesizer) starts one sample into the cycle.
+        """
+        cycles = phase + (frequency / self.sample_rate) * np.arange(1, num_samples + 1)
+        return self._lookup(self.table_indexes(frequency), cycles)
+
+    def render_melody(self, frequencies: Iterable[float], lengths: Iterable[int]) -> np.ndarray:
+        """
+        Render a sequence of notes (a frequency and number of samples each) in one phase-continuous pass, choosing
+        the table of each note from its frequency.
+        """
+        frequencies = np.asarray(frequencies, dtype=float)
+        lengths = np.asarray(lengths, dtype=np.int64)
+
+        cycles = np.repeat(frequencies / self.sample_rate, lengths)
+        np.cumsum(cycles, out=cycles)
+        return self._lookup(np.repeat(self.table_indexes(frequencies), lengths), cycles)
+
+
+@lru_cache(maxsize=None)
+def shared_wavetable(waveform: Waveform, sample_rate: int = 44100) -> Wavetable:
+    """
+    Get the default wavetable of a waveform and sample rate, built once and shared (it is never modified).
+    """
+    return Wavetable(waveform, sample_rate)
@@ -1,4 +1,5 @@
 from composer.tone import Tone
+from composer.timeline import Timeline
 from composer.pitches import Pitch, KeySignature
 from composer.notes import Note
 from composer.scales import ScaleMode
@@ -11,6 +12,7 @@ NOTE_COUNT = 12
 
 if __name__=="__main__":
     print("Composing song..")
+    Tone.enable_waveform_cache()
     key_signature = KeySignature(pitch=Pitch(ROOT_FREQUENCY), mode=MODE)
     random_notes = [
         Note.random(key_signature=key_signature)
@@ -23,8 +25,10 @@ if __name__=="__main__":
     Tone.write_midi_melody(f"my-song{timestamp}.mid", random_notes)
 
     print("Playing song..")
+    timeline = Timeline()
     for _ in range(BARS):
-        Tone.play_melody(random_notes)
-        Tone.rest(0.005)
+        timeline.add_melody(random_notes)
+        timeline.add_rest(0.005)
+    timeline.play()
 
 
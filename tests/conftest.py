@@ -0,0 +1,28 @@
+import pytest
+
+from composer.notes import Note, Duration, NoteValue, TimeSignature
+from composer.pitches import Pitch
+
+# (pitch string, seconds) of each note of the default test melody
+MELODY = [('A4', 0.25), ('C5', 0.1), ('E5', 0.3), ('A5', 0.05)]
+
+
+@pytest.fixture
+def make_melody():
+    """
+    A factory of melodies, from (pitch string, seconds) pairs (by default, those of MELODY).
+    """
+    def make(notes=MELODY):
+        return [Note(pitch=Pitch(pitch_str), duration=Duration(duration)) for pitch_str, duration in notes]
+
+    return make
+
+
+@pytest.fixture
+def triplet_melody():
+    """
+    A melody of triplet 32nd notes at 97bpm, whose lengths are whole numbers of ticks but not of samples.
+    """
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    duration = Duration(note_value=NoteValue.THIRTY_SECOND * 2 / 3, bpm=97, time_signature=time_signature)
+    return [Note(pitch=Pitch(pitch_str), duration=duration) for pitch_str in ['A4', 'C5', 'E5'] * 333]
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import sys
+
+from composer.additive import additive_wave
+from composer.tone import Tone, SAMPLE_RATE
+
+
+@pytest.mark.parametrize('frequencies', [
+    [440],
+    [25, 50, 100, 200, 400, 800],
+    [110 * i for i in range(1, 41)],
+    [30, 21000],
+])
+def test_additive_wave_matches_time_domain_chord(frequencies):
+    expected = Tone.default().synthesizer.generate_chord([float(f) for f in frequencies], 0.5)
+    wave_ = additive_wave(frequencies, 0.5, sample_rate=SAMPLE_RATE)
+
+    assert len(wave_) == len(expected)
+    assert np.abs(wave_ - expected).max() < 1e-3
+
+
+def test_additive_wave_amplitudes():
+    wave_ = additive_wave([440, 880], 0.25, amplitudes=[1, 0])
+    expected = Tone.default().synthesizer.generate_constant_wave(440, 0.25)
+
+    assert np.abs(wave_ - expected).max() < 1e-3
+
+
+def test_tone_uses_additive_engine_for_large_chords():
+    organ = [55 * 2 ** i for i in range(8)]
+    wave_ = Tone.wave_from_chord(organ, duration=0.25)
+
+    assert np.abs(wave_ - Tone.default().synthesizer.generate_chord([float(f) for f in organ], 0.25)).max() < 1e-3
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
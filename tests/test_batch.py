@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+import sys
+
+from composer.__main__ import main
+from composer.batch import job_grid, generate_song, run_batch, MANIFEST_FILENAME
+from composer.scales import ScaleMode
+
+
+def test_job_grid():
+    jobs = job_grid(modes=[ScaleMode.MAJOR, ScaleMode.MINOR], root_frequencies=[220, 440], bpms=[80],
+                    note_counts=[4, 8], songs_per_combination=3, seed=10)
+
+    assert len(jobs) == 2 * 2 * 1 * 2 * 3
+    assert [job.seed for job in jobs] == list(range(10, 10 + len(jobs)))
+    assert len({job.name for job in jobs}) == len(jobs)
+    assert {(job.mode, job.root_frequency, job.num_notes) for job in jobs} == \
+        {(mode, root, count) for mode in [ScaleMode.MAJOR, ScaleMode.MINOR] for root in [220, 440] for count in [4, 8]}
+
+
+def test_generate_song_is_reproducible():
+    job, other_job = job_grid(note_counts=[16], songs_per_combination=2)
+
+    song = generate_song(job)
+    assert len(song) == 16
+    assert [(note.pitch, note.duration.value) for note in song] == \
+        [(note.pitch, note.duration.value) for note in generate_song(job)]
+    assert [note.pitch for note in song] != [note.pitch for note in generate_song(other_job)]
+
+
+def test_run_batch(tmp_path):
+    jobs = job_grid(modes=[ScaleMode.MAJOR, ScaleMode.MINOR], note_counts=[3], songs_per_combination=5)
+    entries = list(run_batch(jobs, str(tmp_path), processes=2))
+
+    assert [entry['name'] for entry in entries] == [job.name for job in jobs]
+    for entry in entries:
+        assert os.path.getsize(tmp_path / entry['wav']) == 44 + 2 * entry['num_samples']
+        assert os.path.exists(tmp_path / entry['midi'])
+
+    with open(tmp_path / MANIFEST_FILENAME) as manifest:
+        assert [json.loads(line) for line in manifest] == entries
+
+
+def test_batch_command(tmp_path, capsys):
+    main(['batch', '--songs', '2', '--modes', 'minor', '--notes', '4', '--processes', '1', '--quiet',
+          '--out-dir', str(tmp_path)])
+
+    assert "Wrote 2 songs" in capsys.readouterr().out
+    with open(tmp_path / MANIFEST_FILENAME) as manifest:
+        assert [json.loads(line)['mode'] for line in manifest] == ['minor', 'minor']
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
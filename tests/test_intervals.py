@@ -1,3 +1,6 @@
+import copy
+import pickle
+
 import pytest
 import sys
 
@@ -12,6 +15,10 @@ def test_interval():
 
     assert interval * 2 == 1
     assert Interval(1) == Interval(1)
+    assert hash(Interval(1)) == hash(Interval(1))
+
+    with pytest.raises(AttributeError):
+        interval.value = 2
 
 
 def test_temperament():
@@ -46,5 +53,12 @@ def test_twelve_tone_temperament():
         assert JustIntonation.intervals[i] == JustIntonation.temperament_12.intervals[i]
 
 
+def test_interval_pickle_and_copy():
+    interval = Interval(3 / 2)
+    assert pickle.loads(pickle.dumps(interval)) == interval
+    assert copy.deepcopy(interval) == interval
+    assert copy.copy(interval).value == 3 / 2
+
+
 if __name__ == '__main__':
     pytest.main(sys.argv)
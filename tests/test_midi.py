@@ -0,0 +1,244 @@
+import struct
+
+import numpy as np
+import pytest
+import sys
+
+from composer.midi import variable_length, encode_variable_length, ticks_from_seconds, note_events, \
+    write_midi_tracks, write_midi_score, quarter_note_bpm, TICKS_PER_QUARTER, MidiFile, read_midi_tracks, \
+    read_midi_notes, read_midi_score
+from composer.notes import Note, Duration, TimeSignature, NoteValue, TempoMap
+from composer.pitches import Pitch
+from composer.scores import Track, Score, NOTE_DTYPE
+from composer.tone import Tone
+
+
+def read_chunks(file_path):
+    with open(file_path, 'rb') as file:
+        data = file.read()
+
+    chunks = []
+    while data:
+        chunk_type, length = data[:4], struct.unpack('>I', data[4:8])[0]
+        chunks.append((chunk_type, data[8:8 + length]))
+        data = data[8 + length:]
+    return chunks
+
+
+def test_variable_length():
+    # examples from the Standard MIDI File specification
+    examples = {0x00: '00', 0x40: '40', 0x7F: '7f', 0x80: '8100', 0x2000: 'c000', 0x3FFF: 'ff7f',
+                0x4000: '818000', 0x100000: 'c08000', 0x1FFFFF: 'ffff7f', 0x200000: '81808000',
+                0x8000000: 'c0808000', 0xFFFFFFF: 'ffffff7f'}
+    for value, encoded in examples.items():
+        assert variable_length(value).hex() == encoded
+
+    _, lengths = encode_variable_length(np.array(list(examples)))
+    assert lengths.tolist() == [len(encoded) // 2 for encoded in examples.values()]
+
+
+def test_ticks_from_seconds():
+    assert ticks_from_seconds([0, 0.5, 1, 2]).tolist() == [0, 480, 960, 1920]
+
+    # 60bpm for the first 2 seconds, then 120bpm
+    ticks = ticks_from_seconds([1, 2, 2.5, 3], TempoMap.from_seconds([(0, 60), (2, 120)]))
+    assert ticks.tolist() == [960, 1920, 1920 + 960, 1920 + 1920]
+
+
+def test_note_events():
+    track = Track()
+    track.append(0, 0.5, 440, velocity=100)
+    track.append(0.5, 0.5, 440, velocity=90)
+    track.append(0.5, 0, 220, velocity=80)
+
+    ticks, keys, velocities = note_events(track)
+    # the repeated note is released before it's played again, and notes last at least a tick
+    assert list(zip(ticks.tolist(), keys.tolist(), velocities.tolist())) == \
+        [(0, 69, 100), (480, 69, 0), (480, 69, 90), (480, 57, 80), (481, 57, 0), (960, 69, 0)]
+
+
+def test_write_midi_tracks(tmp_path):
+    track = Track(name="Lead")
+    track.append(0, 1, 440, velocity=100)
+    track.append(1, 0.5, Pitch('C5').frequency, velocity=100)
+
+    file_path = str(tmp_path / "track.mid")
+    write_midi_tracks(file_path, [track], TempoMap([(0, 120), (1, 120), (2, 60)]))
+
+    (header_type, header), (conductor_type, conductor), (track_type, data) = read_chunks(file_path)
+    assert header_type == b'MThd' and conductor_type == b'MTrk' and track_type == b'MTrk'
+    assert struct.unpack('>HHH', header) == (1, 2, TICKS_PER_QUARTER)
+
+    # the redundant tempo change is dropped: 120bpm, then 60bpm after 2 quarters (1 second)
+    assert conductor.hex() == '00ff510307a120' + '8f00ff51030f4240' + '00ff2f00'
+
+    # one status byte, then running status with note offs as note ons of velocity 0
+    assert data.hex() == '00ff03044c656164' + '009045' + '64' + '8f004500' + '004864' + '83604800' + '00ff2f00'
+
+
+def test_write_midi_tracks_skips_percussion_channel(tmp_path):
+    track = Track()
+    track.append(0, 1, 440)
+
+    file_path = str(tmp_path / "tracks.mid")
+    write_midi_tracks(file_path, [track] * 17)
+
+    # the first event of each track (after a delta of 0) has the status byte, with the channel in its low bits
+    channels = [data[1] & 0x0F for _, data in read_chunks(file_path)[2:]]
+    assert channels == [0, 1, 2, 3, 4, 5, 6, 7, 8, 10, 11, 12, 13, 14, 15, 0, 1]
+
+    # the tracks are read back in order
+    assert len(list(read_midi_tracks(file_path))) == 17
+
+
+def test_write_midi_score(tmp_path):
+    score = Score([Track.from_notes([Note(Pitch('A4'), Duration(0.5))] * 3)] * 2, bpm=120,
+                  time_signature=TimeSignature(6, NoteValue.EIGHTH))
+    assert quarter_note_bpm(120, score.time_signature) == 60
+
+    file_path = str(tmp_path / "score.mid")
+    write_midi_score(file_path, score)
+
+    chunks = read_chunks(file_path)
+    assert len(chunks) == 4
+    assert chunks[1][1].startswith(bytes.fromhex('00ff58040603') + bytes([12, 8]))
+
+
+def test_write_midi_melody_tempo_events(tmp_path):
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    melody = [Note(Pitch('A4'), Duration(note_value=NoteValue.QUARTER, bpm=bpm, time_signature=time_signature))
+              for bpm in [120, 120, 120, 90, 90]]
+
+    file_path = str(tmp_path / "melody.mid")
+    Tone.write_midi_melody(file_path, melody)
+
+    conductor = read_chunks(file_path)[1][1]
+    assert conductor.count(bytes([0xFF, 0x51])) == 2
+    # the tempo changes after 3 quarter notes
+    assert conductor.hex() == '00ff510307a120' + variable_length(3 * TICKS_PER_QUARTER).hex() + 'ff51030a2c2b' + \
+        '00ff2f00'
+
+
+def test_write_midi_melody_ticks_do_not_drift(tmp_path):
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    triplet = NoteValue.EIGHTH * 2 / 3
+    melody = [Note(Pitch('A4'), Duration(note_value=triplet, bpm=bpm, time_signature=time_signature))
+              for bpm in [70, 110] for _ in range(3000)]
+
+    file_path = str(tmp_path / "melody.mid")
+    Tone.write_midi_melody(file_path, melody)
+
+    with MidiFile(file_path) as midi_file:
+        track, = midi_file.tracks()
+        tempo_map = midi_file.tempo_map
+    assert tempo_map.beats == [0, 1000]
+    assert tempo_map.bpms == pytest.approx([70, 110])
+    # every triplet is a whole number of ticks, so notes start exactly on their (third of a) beat
+    assert np.allclose(track.onsets, tempo_map.seconds_from_beats(np.arange(6000) / 3), rtol=0, atol=1e-9)
+
+
+def test_midi_round_trip(tmp_path):
+    random_state = np.random.RandomState(0)
+    notes = np.empty(5000, dtype=NOTE_DTYPE)
+    notes['duration'] = random_state.choice([0.125, 0.25, 0.5, 1.0], len(notes))
+    notes['onset'] = np.cumsum(random_state.choice([0, 0.125, 0.25], len(notes)))
+    # notes of the same key don't overlap, since MIDI can't tell which of overlapping notes of a key ends first
+    notes['midi_number'] = 21 + np.arange(len(notes)) * 7 % 88
+    notes['frequency'] = 0
+    notes['velocity'] = random_state.randint(1, 128, len(notes))
+    tracks = [Track(notes, name="Piano"), Track(notes[::2])]
+
+    file_path = str(tmp_path / "tracks.mid")
+    write_midi_tracks(file_path, tracks, TempoMap.from_seconds([(0, 90), (10, 150)]))
+
+    read_tracks = list(read_midi_tracks(file_path))
+    assert [track.name for track in read_tracks] == ["Piano", None]
+    for track, read_track in zip(tracks, read_tracks):
+        # notes with the same onset are read back ordered by key
+        order = np.lexsort((track.midi_numbers, track.onsets))
+        read_order = np.lexsort((read_track.midi_numbers, read_track.onsets))
+        assert np.allclose(read_track.onsets[read_order], track.onsets[order], atol=1e-3)
+        assert np.allclose(read_track.durations[read_order], track.durations[order], atol=1e-3)
+        assert np.array_equal(read_track.midi_numbers[read_order], track.midi_numbers[order])
+        assert np.array_equal(read_track.velocities[read_order], track.velocities[order])
+        assert np.allclose(read_track.frequencies[read_order],
+                           [Pitch(midi_number=int(m)).frequency for m in track.midi_numbers[order]])
+
+
+def test_read_midi_notes_and_score(tmp_path):
+    time_signature = TimeSignature(3, NoteValue.QUARTER)
+    melody = [Note(Pitch(pitch_str), Duration(note_value=note_value, bpm=90, time_signature=time_signature))
+              for pitch_str, note_value in [('A4', NoteValue.QUARTER), ('C5', NoteValue.EIGHTH), ('E5', NoteValue.HALF)]]
+
+    file_path = str(tmp_path / "melody.mid")
+    Tone.write_midi_melody(file_path, melody)
+    notes = list(read_midi_notes(file_path))
+    assert [note.pitch for note in notes] == [note.pitch for note in melody]
+    assert [note.duration.value for note in notes] == pytest.approx([note.duration.value for note in melody])
+
+    score = Score([Track.from_notes(melody)], bpm=90, time_signature=time_signature)
+    write_midi_score(file_path, score)
+    read_score = read_midi_score(file_path)
+    assert read_score.bpm == pytest.approx(90)
+    assert (read_score.time_signature.num_beats, read_score.time_signature.beat_value) == (3, NoteValue.QUARTER)
+    assert np.allclose(read_score.tracks[0].onsets, score.tracks[0].onsets)
+
+
+def test_accelerando_round_trip(tmp_path):
+    # an accelerando from 60bpm to 180bpm, with a tempo change every 16th of a beat
+    beats = np.arange(0, 256, 1 / 16)
+    tempo_map = TempoMap(zip(beats, np.linspace(60, 180, len(beats)).round(3)))
+    score = Score([Track.from_beats(np.arange(256), np.full(256, 0.5), np.full(256, 440.0), tempo_map)],
+                  time_signature=TimeSignature(6, NoteValue.EIGHTH), tempo_map=tempo_map)
+    assert score.bpm == 60
+
+    file_path = str(tmp_path / "accelerando.mid")
+    write_midi_score(file_path, score)
+
+    read_score = read_midi_score(file_path)
+    assert len(read_score.tempo_map) == len(tempo_map)
+    assert np.allclose(read_score.tempo_map.beats, tempo_map.beats)
+    assert np.allclose(read_score.tempo_map.bpms, tempo_map.bpms, rtol=1e-6)
+    # notes are read back where the tempo map puts them
+    assert np.allclose(read_score.tracks[0].onsets, score.tracks[0].onsets, atol=1e-3)
+    assert np.allclose(read_score.tracks[0].durations, score.tracks[0].durations, atol=1e-3)
+
+
+def test_read_format_0_file(tmp_path):
+    events = bytes.fromhex(''.join([
+        '00ff510307a120',  # 120bpm
+        '00f0037e7f09',  # sysex
+        '00c005',  # program change
+        '00903c40',  # C4 on
+        '004050',  # E4 on, with running status
+        '8740804000',  # E4 off (note off) after a quarter note
+        '00ff510307a120',  # the same tempo
+        '8740903c00',  # C4 off (note on with velocity 0) after another quarter note
+        '00b00740',  # control change
+        '00ff2f00',
+    ]))
+    file_path = str(tmp_path / "format0.mid")
+    with open(file_path, 'wb') as file:
+        file.write(b'MThd' + struct.pack('>IHHH', 6, 0, 1, 960) + b'MTrk' + struct.pack('>I', len(events)) + events)
+
+    with MidiFile(file_path) as midi_file:
+        track, = midi_file.tracks()
+        assert midi_file.bpm == 120
+
+    assert track.midi_numbers.tolist() == [60, 64]
+    assert track.velocities.tolist() == [0x40, 0x50]
+    assert track.onsets.tolist() == [0, 0]
+    assert track.durations.tolist() == [1.0, 0.5]
+
+
+def test_read_invalid_file(tmp_path):
+    file_path = str(tmp_path / "invalid.mid")
+    with open(file_path, 'wb') as file:
+        file.write(b'RIFF0000WAVE')
+
+    with pytest.raises(ValueError):
+        MidiFile(file_path)
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
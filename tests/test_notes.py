@@ -1,7 +1,13 @@
+import copy
+import pickle
+
+import numpy as np
 import pytest
 import sys
 
-from composer.notes import Duration, NoteValue, Note, TimeSignature, duration_from_note_value, note_value_from_duration
+from composer.notes import Duration, NoteValue, Note, TimeSignature, TempoMap, duration_from_note_value, \
+    note_value_from_duration, ticks_from_note_value, seconds_from_ticks, samples_from_ticks, onset_ticks, \
+    TICKS_PER_QUARTER, note_value_table, duration_table, viable_note_values_generator
 from composer.pitches import KeySignature, Pitch
 from composer.scales import ScaleMode
 
@@ -36,6 +42,9 @@ def test_random_duration():
 
     random_duration3 = Duration.random(bpm=60, time_signature=TimeSignature(1, NoteValue.HALF))
     assert isinstance(random_duration3, Duration)
+    assert random_duration3.note_value in NoteValue.all()
+    assert random_duration3.ticks == ticks_from_note_value(random_duration3.note_value)
+    assert random_duration3.value == duration_from_note_value(random_duration3.note_value, 60, NoteValue.HALF)
 
 
 def test_random_duration_with_max_duration():
@@ -47,6 +56,34 @@ def test_random_duration_with_max_duration():
     assert random_duration.value <= max_duration
 
 
+def test_duration_is_compact_and_immutable():
+    duration = Duration(note_value=NoteValue.QUARTER, bpm=60, time_signature=TimeSignature(4, NoteValue.QUARTER))
+    assert duration.value == 1
+    assert duration.seconds is None
+    assert duration.bpm == 60
+    assert Duration(3).seconds == 3
+
+    assert not hasattr(duration, '__dict__')
+    with pytest.raises(AttributeError):
+        duration.value = 2
+
+    note = Note(pitch=Pitch(440), duration=duration)
+    assert not hasattr(note, '__dict__')
+
+
+def test_note_pickle_and_copy():
+    time_signature = TimeSignature(3, NoteValue.QUARTER)
+    notes = [Note(Pitch(440), Duration(0.5)),
+             Note(Pitch('C5'), Duration(note_value=NoteValue.EIGHTH, bpm=90, time_signature=time_signature))]
+
+    for copied in [pickle.loads(pickle.dumps(notes)), copy.deepcopy(notes)]:
+        for note, copied_note in zip(notes, copied):
+            assert copied_note.pitch is note.pitch
+            for name in Duration.__slots__:
+                assert getattr(copied_note.duration, name) == getattr(note.duration, name)
+            assert copy.copy(note.duration).value == note.duration.value
+
+
 def test_random_note():
     note = Note.random(key_signature=KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR),
                        time_signature=TimeSignature(4, NoteValue.QUARTER), bpm=60, duration_factor=1)
@@ -56,5 +93,102 @@ def test_random_note():
     assert isinstance(note.duration, Duration)
 
 
+def test_ticks():
+    assert ticks_from_note_value(NoteValue.QUARTER) == TICKS_PER_QUARTER
+    assert NoteValue(NoteValue.EIGHTH).dot().ticks == 720
+    assert ticks_from_note_value(NoteValue.QUARTER / 3) == 320
+    assert TimeSignature(6, NoteValue.EIGHTH).ticks_per_bar == 6 * 480
+
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    duration = Duration(note_value=NoteValue.HALF, bpm=120, time_signature=time_signature)
+    assert duration.ticks == 1920 and duration.value == 1
+    assert Duration(ticks=1920, bpm=120, time_signature=time_signature).value == 1
+    assert Duration(ticks=1920, bpm=120, time_signature=time_signature).note_value == NoteValue.HALF
+    assert Duration(1).ticks is None
+
+    assert seconds_from_ticks(480, 60, NoteValue.QUARTER) == 0.5
+    assert onset_ticks([480, 960, 240]).tolist() == [0, 480, 1440]
+    assert onset_ticks([]).tolist() == []
+
+
+def test_samples_from_ticks_do_not_drift():
+    # 10 hours of triplet eighths at 97bpm, whose lengths in seconds (and samples) aren't whole numbers
+    note_ticks = np.full(97 * 60 * 10 * 3, ticks_from_note_value(NoteValue.EIGHTH * 2 / 3))
+    onsets = onset_ticks(note_ticks)
+    samples = samples_from_ticks(onsets, 97, NoteValue.QUARTER, 44100)
+
+    # every beat (3 triplets) starts at exactly the rounded sample of its exact time
+    beats = np.arange(len(onsets) // 3)
+    assert np.array_equal(samples[::3], (beats * 44100 * 60 * 2 + 97) // (2 * 97))
+    assert samples[-3] == round((len(beats) - 1) * 44100 * 60 / 97)
+    assert np.allclose(samples_from_ticks(onsets, 97.5, NoteValue.QUARTER, 44100),
+                       onsets / TICKS_PER_QUARTER * 60 / 97.5 * 44100, atol=0.5)
+
+
+def test_duration_table_is_shared():
+    assert TimeSignature(4, NoteValue.QUARTER) == TimeSignature(4, NoteValue.QUARTER)
+    assert hash(TimeSignature(4, NoteValue.QUARTER)) == hash(TimeSignature(4, NoteValue.QUARTER))
+    assert TimeSignature(3, NoteValue.QUARTER) != TimeSignature(3, NoteValue.EIGHTH)
+    # time signatures are cache keys, so they can't change
+    with pytest.raises(AttributeError):
+        TimeSignature(4, NoteValue.QUARTER).num_beats = 3
+    assert pickle.loads(pickle.dumps(TimeSignature(6, NoteValue.EIGHTH))) == TimeSignature(6, NoteValue.EIGHTH)
+
+    table = note_value_table(90, TimeSignature(4, NoteValue.QUARTER), 1)
+    assert table is note_value_table(90, TimeSignature(4, NoteValue.QUARTER), 1)
+    assert table == tuple(viable_note_values_generator(90, TimeSignature(4, NoteValue.QUARTER), 1))
+    assert table != note_value_table(90, TimeSignature(4, NoteValue.QUARTER), 2)
+
+    durations = duration_table(90, TimeSignature(4, NoteValue.QUARTER), 1)
+    assert durations is duration_table(90, TimeSignature(4, NoteValue.QUARTER), 1)
+    assert durations.tolist() == [duration_from_note_value(note_value, 90, NoteValue.QUARTER) for note_value in table]
+    with pytest.raises(ValueError):
+        durations[0] = 1
+
+
+def test_random_duration_batch():
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    durations = Duration.random_batch(10000, bpm=120, time_signature=time_signature, max_duration=1,
+                                      random_state=np.random.RandomState(0))
+    assert durations.shape == (10000,)
+    assert set(durations.tolist()) == set(duration_table(120, time_signature, 1).tolist())
+
+    assert np.array_equal(Duration.random_batch(100, factor=2, random_state=np.random.RandomState(1)),
+                          Duration.random_batch(100, factor=2, random_state=np.random.RandomState(1)))
+    assert np.all((Duration.random_batch(100, factor=2) >= 0) & (Duration.random_batch(100, factor=2) < 2))
+
+
+def test_tempo_map():
+    # 60bpm for 4 beats, 120bpm for 4 beats, then 30bpm
+    tempo_map = TempoMap([(4, 120), (0, 60), (6, 120), (8, 30)])
+    assert list(tempo_map) == [(0, 60), (4, 120), (8, 30)]
+    assert tempo_map.seconds == [0, 4, 6]
+
+    assert [tempo_map.bpm_at(beat) for beat in [0, 3.9, 4, 10]] == [60, 60, 120, 30]
+    assert [tempo_map.seconds_at(beat) for beat in [2, 4, 5, 9]] == [2, 4, 4.5, 8]
+    assert [tempo_map.beat_at(seconds) for seconds in [2, 4, 4.5, 8]] == [2, 4, 5, 9]
+    assert tempo_map.duration(3, 2) == 1.5
+
+    assert TempoMap.from_seconds([(0, 60), (4, 120), (6, 30)]) == tempo_map
+
+    with pytest.raises(ValueError):
+        TempoMap([(0, 0)])
+    with pytest.raises(ValueError):
+        TempoMap([])
+
+
+def test_tempo_map_vectorized():
+    # an accelerando with thousands of tempo changes
+    beats = np.arange(0, 1000, 0.25)
+    tempo_map = TempoMap(zip(beats, np.linspace(40, 200, len(beats))))
+    assert len(tempo_map) == len(beats)
+
+    random_beats = np.random.RandomState(0).uniform(-1, 1001, 1000)
+    seconds = tempo_map.seconds_from_beats(random_beats)
+    assert np.allclose(seconds, [tempo_map.seconds_at(beat) for beat in random_beats])
+    assert np.allclose(tempo_map.beats_from_seconds(seconds), random_beats)
+    assert np.allclose(tempo_map.beats_from_seconds(seconds), [tempo_map.beat_at(time) for time in seconds])
+
+
 if __name__ == '__main__':
     pytest.main(sys.argv)
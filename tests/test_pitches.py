@@ -5,8 +5,10 @@ import sys
 
 from composer.pitches import PitchClass, PitchInfo, Accidental, Pitch, KeySignature, CHROMATIC_PITCHES_INFO, \
     complete_pitch_info_generator, is_pitch_complete, is_matching_pitch_info, matching_pitch_info_generator, \
-    is_enharmonic_match, pitch_info_from_pitch_string, pitch_info_from_frequency
+    is_enharmonic_match, pitch_info_from_pitch_string, pitch_info_from_frequency, semitone_from_pitch_info, \
+    pitch_info_from_semitone, PitchArray, parse_pitches
 
+from composer.intervals import JustIntonation
 from composer.scales import ScaleMode
 
 
@@ -167,6 +169,34 @@ def test_pitch_info_from_pitch_string():
     assert a_sharp_5.register == 5
 
 
+def test_pitch_info_from_pitch_string_registers():
+    c10 = pitch_info_from_pitch_string('C10')
+    assert c10.pitch_class == PitchClass.C
+    assert c10.register == 10
+
+    a_minus_1 = pitch_info_from_pitch_string('A-1')
+    assert a_minus_1.register == -1
+    assert semitone_from_pitch_info(a_minus_1) == 9
+
+    g_flat_4 = pitch_info_from_pitch_string('G4b')
+    assert g_flat_4.pitch_class == PitchClass.G
+    assert g_flat_4.accidental == Accidental.FLAT
+    assert g_flat_4.register == 4
+
+
+def test_pitch_info_from_invalid_pitch_string():
+    for pitch_str in ['', 'H4', 'A', 'A#4b', 'Cb4', '4A']:
+        with pytest.raises(ValueError):
+            pitch_info_from_pitch_string(pitch_str)
+
+
+def test_parse_pitches():
+    pitch_strs = ['A4', 'Bb4', 'C5', 'A4']
+
+    assert parse_pitches(pitch_strs) == [Pitch('A4'), Pitch('Bb4'), Pitch('C5'), Pitch('A4')]
+    assert list(parse_pitches(iter(pitch_strs), as_midi=True)) == [69, 70, 72, 69]
+
+
 def test_pitch_info_from_frequency():
     a_natural = pitch_info_from_frequency(440)
 
@@ -175,17 +205,136 @@ def test_pitch_info_from_frequency():
     assert a_natural.accidental == Accidental.NATURAL
 
 
+def test_pitch_info_from_frequency_register():
+    assert pitch_info_from_frequency(220).register == 3
+    assert pitch_info_from_frequency(415.3).register == 4
+    assert pitch_info_from_frequency(523.25).register == 5
+    assert pitch_info_from_frequency(261.63).register == 4
+
+
+def test_semitone_round_trip():
+    for semitone in range(0, 128):
+        assert semitone_from_pitch_info(pitch_info_from_semitone(semitone)) == semitone
+        assert semitone_from_pitch_info(pitch_info_from_semitone(semitone, flat=True)) == semitone
+
+    b_flat = pitch_info_from_semitone(70, flat=True)
+    assert b_flat.pitch_class == PitchClass.B
+    assert b_flat.accidental == Accidental.FLAT
+    assert b_flat.enharmonic_pitch_class == PitchClass.A
+    assert b_flat.register == 4
+
+
+def test_pitch_transpose():
+    a4 = Pitch('A4')
+
+    assert a4.transpose(0) is a4
+    assert Pitch('Bb4').transpose(0) is Pitch('Bb4')
+    assert Pitch('A4#').transpose(0) is Pitch('A4#')
+    assert a4.transpose(12) is Pitch('A5')
+    assert a4.transpose(3) is Pitch('C5')
+    assert a4.transpose(-1) is Pitch('Ab4')
+    assert a4.next() is Pitch('A#4')
+    assert Pitch('B4').next() is Pitch('C5')
+    assert Pitch('C5').prev() is Pitch('B4')
+    assert math.isclose(a4.transpose(-24).frequency, 110)
+
+
 def test_pitch_matches_other():
     pitch_a = Pitch(440)
     pitch_b = Pitch('A4')
     assert pitch_a.matches(pitch_b)
 
 
+def test_pitch_array_conversions():
+    frequencies = [440, 466.16, 523.25, 261.63, 220]
+    pitches = PitchArray.from_frequencies(frequencies)
+
+    assert len(pitches) == 5
+    assert list(pitches.names()) == ['A4', 'A#4', 'C5', 'C4', 'A3']
+    assert list(pitches.registers) == [Pitch(f).register for f in frequencies]
+    assert list(pitches.pitch_class_indexes) == [9, 10, 0, 0, 9]
+    assert pitches.to_pitches() == [Pitch(f) for f in frequencies]
+
+    from_midi = PitchArray.from_midi([69, 70, 72])
+    assert list(from_midi.names()) == ['A4', 'A#4', 'C5']
+    assert from_midi.frequencies[0] == 440
+
+    from_names = PitchArray.from_names(['A4', 'Bb4', 'C5', 'A4'])
+    assert list(from_names.midi_numbers) == [69, 70, 72, 69]
+    assert from_names[2] is Pitch('C5')
+
+
+def test_pitch_array_transpose_and_matches():
+    pitches = PitchArray.from_names(['A4', 'C5'])
+
+    transposed = pitches.transpose(12)
+    assert list(transposed.names()) == ['A5', 'C6']
+    assert list(transposed.midi_numbers) == [81, 84]
+
+    assert list(pitches.matches(Pitch(880))) == [Pitch(440).matches(Pitch(880)), Pitch('C5').matches(Pitch(880))]
+    assert pitches.matches(transposed).all()
+
+
 def test_random_pitch():
     random_pitch = Pitch.random(key_signature=KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR))
     assert isinstance(random_pitch, Pitch)
     assert is_pitch_complete(random_pitch)
 
 
+def test_pitch_is_interned():
+    a4 = Pitch(440)
+    assert Pitch(440) is a4
+    assert Pitch('A4') is a4
+    assert Pitch(midi_number=69) is a4
+    assert Pitch(pitch_class=PitchClass.A, accidental=Accidental.NATURAL, register=4) is a4
+
+    assert Pitch('A#4') is not Pitch('Bb4')
+    assert Pitch('A#4') != Pitch('Bb4')
+    assert Pitch('A5') is not a4
+
+
+def test_pitch_is_hashable_and_immutable():
+    pitches = {Pitch(440): 'a', Pitch('C5'): 'c'}
+    assert pitches[Pitch('A4')] == 'a'
+    assert pitches[Pitch('C5')] == 'c'
+
+    with pytest.raises(AttributeError):
+        Pitch(440).frequency = 880
+
+    assert copy.deepcopy(Pitch(440)) is Pitch(440)
+
+
+def test_pitch_temperament():
+    equal_e5 = Pitch('E5')
+    just_e5 = Pitch('E5', temperament=JustIntonation)
+
+    assert just_e5 is not equal_e5
+    assert just_e5.temperament is JustIntonation
+    assert math.isclose(just_e5.frequency, 440 * 3 / 2)
+    assert just_e5.next().temperament is JustIntonation
+
+
+def test_pitch_pickles_to_interned_instance():
+    import pickle
+
+    b_flat = Pitch('Bb4')
+    assert pickle.loads(pickle.dumps(b_flat)) is b_flat
+
+
+def test_key_signature_scale_is_cached():
+    key_signature = KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR)
+    scale = key_signature.scale
+
+    assert isinstance(scale, tuple)
+    assert len(scale) == 8
+    assert scale[0].matches(Pitch('A4'))
+    assert key_signature.scale is scale
+    assert KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR).scale is scale
+    assert KeySignature(pitch=Pitch(440), mode=ScaleMode.MINOR).scale is not scale
+
+    random_pitch = Pitch.random(key_signature=key_signature)
+    assert random_pitch in scale
+
+
 if __name__ == '__main__':
     pytest.main(sys.argv)
@@ -0,0 +1,137 @@
+import asyncio
+import time
+import wave
+
+import numpy as np
+import pytest
+import sys
+
+from composer.playback import RingBuffer, Playback, NullDevice, FileDevice
+from composer.songs import random_notes, ambient_song
+from composer.tone import Tone, SAMPLE_RATE
+
+
+# a short melody, so that tests playing it in real time are quick
+SHORT_MELODY = [('A4', 0.05), ('C5', 0.02), ('E5', 0.03)]
+
+
+def test_ring_buffer_wraps_around():
+    ring = RingBuffer(8)
+    assert ring.write(np.arange(6, dtype=np.int16)) == 6
+
+    out = np.zeros(4, dtype=np.int16)
+    assert ring.read(out) == 4
+    assert out.tolist() == [0, 1, 2, 3]
+
+    # only 6 of the samples fit, and they wrap around the end of the buffer
+    assert ring.write(np.arange(10, 20, dtype=np.int16)) == 6
+    assert len(ring) == 8
+    assert ring.free == 0
+
+    out = np.zeros(10, dtype=np.int16)
+    assert ring.read(out) == 8
+    assert out.tolist() == [4, 5, 10, 11, 12, 13, 14, 15, 0, 0]
+    assert len(ring) == 0
+
+
+def test_playback_to_file(tmp_path, make_melody):
+    file_path = str(tmp_path / "playback.wav")
+    playback = Playback(device=FileDevice(file_path, frames_per_buffer=256), buffer_duration=1)
+
+    playback.start(make_melody(SHORT_MELODY))
+    assert playback.wait(timeout=10)
+    playback.stop()
+
+    expected = Tone.render_melody(make_melody(SHORT_MELODY))
+    assert playback.frames_played == len(expected)
+    assert playback.underruns == 0
+
+    with wave.open(file_path, 'rb') as wav_file:
+        samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+
+    # the device keeps pulling (silence) until it is stopped
+    assert np.array_equal(samples[:len(expected)], expected)
+    assert not samples[len(expected):].any()
+
+
+def test_play_is_async(make_melody):
+    async def play():
+        device = NullDevice(frames_per_buffer=256)
+        task = asyncio.ensure_future(Tone.play(make_melody(SHORT_MELODY), device=device))
+
+        # the event loop keeps running while the melody plays
+        ticks = 0
+        while not task.done():
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+        await task
+        return ticks, device.frames_pulled
+
+    ticks, frames_pulled = asyncio.run(play())
+    assert ticks > 5
+    assert frames_pulled >= sum(len(Tone.wave_from_note(note)) for note in make_melody(SHORT_MELODY))
+
+
+def test_play_can_be_cancelled():
+    async def play():
+        playback = Playback(device=NullDevice(frames_per_buffer=256), buffer_duration=0.05)
+        task = asyncio.ensure_future(playback.play([440.0] * 100, duration=0.1))
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return playback
+
+    playback = asyncio.run(play())
+    assert not playback.is_playing
+    assert not playback.wait(timeout=0)
+
+
+def test_pause_and_resume():
+    playback = Playback(device=NullDevice(frames_per_buffer=256), buffer_duration=0.05)
+    playback.start([440.0] * 10, duration=0.1)
+    try:
+        playback.pause()
+        time.sleep(0.02)
+        frames_played = playback.frames_played
+        time.sleep(0.05)
+        assert playback.is_paused
+        assert playback.frames_played == frames_played
+
+        playback.resume()
+        time.sleep(0.05)
+        assert playback.frames_played > frames_played
+    finally:
+        playback.stop()
+
+
+def test_endless_playback_has_bounded_latency():
+    playback = Playback(device=NullDevice(frames_per_buffer=256), latency=0.1)
+    assert playback.latency_bound == pytest.approx(0.1, abs=1 / SAMPLE_RATE)
+
+    playback.start(random_notes(bpm=480))
+    try:
+        assert not playback.wait(timeout=0.5)
+        assert playback.is_playing
+    finally:
+        playback.stop()
+
+    assert playback.frames_played > 0.3 * SAMPLE_RATE
+    assert 0 < playback.max_latency < playback.latency_bound + 0.05
+    # only the notes rendered ahead are tracked
+    assert len(playback._note_starts) < 20
+
+    with pytest.raises(ValueError):
+        Playback(device=NullDevice(frames_per_buffer=1024), latency=0.05)
+
+
+def test_ambient_song():
+    playback = ambient_song(seconds=0.2, device=NullDevice(frames_per_buffer=256), latency=0.05)
+    assert not playback.is_playing
+    assert playback.frames_played > 0
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+import sys
+
+from composer.notes import Note, Duration, NoteValue, TimeSignature, onset_ticks, seconds_from_ticks
+from composer.pitches import Pitch, KeySignature
+from composer.scales import ScaleMode
+from composer.scores import Track, Score
+
+
+# eighth notes at 60bpm (in 4/4)
+EIGHTHS = [(pitch_str, 0.5) for pitch_str in ['A4', 'C5', 'E5', 'A5', 'E5', 'C5', 'A4', 'E4']]
+
+
+def test_track_from_and_to_notes(make_melody):
+    melody = make_melody(EIGHTHS)
+    track = Track.from_notes(melody)
+
+    assert len(track) == len(melody)
+    assert list(track.onsets) == [0.5 * i for i in range(len(melody))]
+    assert list(track.midi_numbers[:2]) == [69, 72]
+    assert track.end == 4
+
+    notes = track.to_notes()
+    assert [note.pitch for note in notes] == [note.pitch for note in melody]
+    assert [note.duration.value for note in notes] == [note.duration.value for note in melody]
+
+
+def test_track_append_grows():
+    track = Track(capacity=1)
+    for i in range(100):
+        track.append(onset=i, duration=1, frequency=440)
+
+    assert len(track) == 100
+    assert track.midi_numbers[-1] == 69
+    assert track.velocities[0] > 0
+
+    with pytest.raises(ValueError):
+        track.append(onset=0, duration=1, frequency=440)
+
+    track.append_note(Note(pitch=Pitch('C5'), duration=Duration(1)))
+    assert track.onsets[-1] == 100
+
+
+def test_track_between_and_bars_are_views(make_melody):
+    track = Track.from_notes(make_melody(EIGHTHS))
+
+    window = track.between(1, 2)
+    assert list(window['onset']) == [1, 1.5]
+    assert window.base is not None
+
+    window['velocity'] = 1
+    assert track.velocities[2] == 1
+
+    score = Score([track], bpm=120, time_signature=TimeSignature(4, NoteValue.QUARTER))
+    assert score.bar_duration == 2
+
+    bars = score.bars()
+    assert [len(bar) for bar in bars] == [4, 4]
+    assert bars[1]['onset'][0] == 2
+
+
+def test_score_from_notes(make_melody):
+    score = Score.from_notes(make_melody(EIGHTHS), bpm=60, time_signature=TimeSignature(4, NoteValue.QUARTER))
+
+    assert len(score.tracks) == 1
+    assert score.end == 4
+    assert [len(notes) for notes in score.between(0, 1)] == [2]
+    assert score.to_notes()[0].duration.bpm == 60
+
+
+def test_track_from_notes_onsets_do_not_drift():
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    notes = [Note(Pitch('A4'), Duration(note_value=NoteValue.QUARTER / 3, bpm=70, time_signature=time_signature))
+             for _ in range(30000)]
+    track = Track.from_notes(notes)
+
+    # every third triplet is on a beat, at exactly the time of the beat
+    beats = np.arange(10000)
+    assert np.array_equal(track.onsets[::3], beats * 60 / 70)
+
+
+def test_track_from_random_notes_sums_ticks():
+    key_signature = KeySignature(pitch=Pitch(440), mode=ScaleMode.MAJOR)
+    time_signature = TimeSignature(4, NoteValue.QUARTER)
+    notes = [Note.random(key_signature=key_signature, time_signature=time_signature, bpm=70) for _ in range(1000)]
+    assert all(note.duration.ticks is not None for note in notes)
+
+    track = Track.from_notes(notes)
+    ticks = onset_ticks([note.duration.ticks for note in notes])
+    assert np.array_equal(track.onsets, seconds_from_ticks(ticks, 70, NoteValue.QUARTER))
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
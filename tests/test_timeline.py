@@ -0,0 +1,108 @@
+import wave
+
+import numpy as np
+import pytest
+import sys
+
+from composer.notes import NoteValue, onset_ticks, samples_from_ticks
+from composer.playback import FileDevice
+from composer.scores import Track, Score
+from composer.timeline import Timeline
+from composer.tone import Tone, SAMPLE_RATE, pcm16_from_wave
+
+
+def test_timeline_matches_render_melody(make_melody):
+    timeline = Timeline()
+    timeline.add_melody(make_melody())
+
+    assert timeline.duration == pytest.approx(0.7)
+    assert np.array_equal(timeline.render(), Tone.render_melody(make_melody()))
+    assert np.array_equal(timeline.render(block_size=1000), timeline.render())
+
+
+def test_rests_are_silence():
+    timeline = Timeline()
+    timeline.add_note(440, duration=0.1)
+    timeline.add_rest(0.05)
+    offset = timeline.add_chord([440, 550], duration=0.1)
+    timeline.add_rest(0.02)
+
+    assert offset == int(0.15 * SAMPLE_RATE)
+    assert timeline.num_samples == int(0.27 * SAMPLE_RATE)
+
+    pcm = timeline.render()
+    assert not pcm[int(0.1 * SAMPLE_RATE):offset].any()
+    assert not pcm[int(0.25 * SAMPLE_RATE):].any()
+    assert np.array_equal(pcm[offset:offset + int(0.1 * SAMPLE_RATE)],
+                          pcm16_from_wave(Tone.wave_from_chord([440, 550], 0.1)))
+
+
+def test_overlapping_sounds_are_mixed():
+    timeline = Timeline()
+    timeline.add_note(220, duration=0.1, at=0)
+    timeline.add_note(330, duration=0.1, at=0.05)
+    assert timeline.cursor == pytest.approx(0.15)
+
+    mix = np.zeros(timeline.num_samples)
+    mix[:4410] += Tone.wave_from_note(220, 0.1)
+    mix[2205:] += Tone.wave_from_note(330, 0.1)
+    assert np.array_equal(timeline.render(), pcm16_from_wave(np.clip(mix, -1, 1)))
+
+
+def test_timeline_does_not_drift():
+    timeline = Timeline()
+    for _ in range(100000):
+        timeline.add_note(440, duration=0.1)
+        timeline.add_rest(1 / 3)
+
+    offsets = [event.offset for event in timeline.events]
+    assert offsets == [round(idx * (0.1 + 1 / 3) * SAMPLE_RATE) for idx in range(100000)]
+
+
+def test_timeline_tracks_and_scores():
+    track = Track()
+    track.append(0, 0.1, 440)
+    track.append(0.2, 0.1, 660)
+    bass = Track()
+    bass.append(0, 0.3, 110)
+
+    timeline = Timeline()
+    timeline.add_rest(0.1)
+    timeline.add_score(Score([track, bass]))
+
+    assert [(event.offset, event.frequencies) for event in timeline.events] == \
+        [(4410, (440,)), (4410, (110,)), (13230, (660,))]
+    assert timeline.cursor == pytest.approx(0.4)
+
+
+def test_timeline_places_notes_in_ticks(triplet_melody):
+    timeline = Timeline()
+    timeline.add_rest(0.5)
+    timeline.add_melody(triplet_melody)
+    timeline.add_note(440, 0.1)
+
+    # notes in ticks start at their exact onsets (from the start of the melody), as rendered by Tone.render_melody
+    pcm = Tone.render_melody(triplet_melody)
+    start = timeline.offset(0.5)
+    ticks = [note.duration.ticks for note in triplet_melody]
+    offsets = [event.offset for event in timeline.events]
+    assert offsets[:-1] == (start + samples_from_ticks(onset_ticks(ticks), 97, NoteValue.QUARTER, SAMPLE_RATE)).tolist()
+    assert offsets[-1] == start + len(pcm)
+    assert np.array_equal(timeline.render()[start:start + len(pcm)], pcm)
+
+
+def test_timeline_play(tmp_path, make_melody):
+    timeline = Timeline()
+    timeline.add_melody(make_melody())
+    timeline.add_rest(0.1)
+
+    file_path = str(tmp_path / "timeline.wav")
+    timeline.play(device=FileDevice(file_path, frames_per_buffer=512, realtime=True))
+
+    with wave.open(file_path, 'rb') as wav_file:
+        samples = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
+    assert np.array_equal(samples[:timeline.num_samples], timeline.render())
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
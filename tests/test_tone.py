@@ -0,0 +1,273 @@
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+import sys
+
+from composer.notes import onset_ticks, samples_from_ticks, NoteValue
+from composer.pitches import Pitch
+from synthesizer import Waveform
+
+from composer.tone import Tone, SquareTone, SAMPLE_RATE, num_samples, pcm16_from_wave, write_pcm16_wav, open_pcm16_wav, \
+    WaveformCache, phase_continuous_wave, segment_bounds, LookaheadRenderer, notes_with_lengths
+
+
+def test_render_melody_matches_concatenated_notes(make_melody):
+    melody = make_melody()
+
+    pcm = Tone.render_melody(melody)
+    expected = pcm16_from_wave(np.concatenate([Tone.wave_from_note(note) for note in melody]))
+
+    assert pcm.dtype == np.int16
+    assert len(pcm) == sum(num_samples(note.duration.value) for note in melody)
+    assert np.array_equal(pcm, expected)
+
+
+def test_render_progression_matches_concatenated_chords():
+    chords = [[440, 550, 660], [Pitch('A3'), Pitch('E4')]]
+
+    pcm = Tone.render_progression(chords, duration=0.2)
+    expected = pcm16_from_wave(np.concatenate([Tone.wave_from_chord(chord, 0.2) for chord in chords]))
+
+    assert np.array_equal(pcm, expected)
+
+
+def test_phase_continuous_wave(make_melody):
+    frequencies = [440, 660, 330, 880]
+    lengths = [1001, 757, 333, 2000]
+    wave_ = phase_continuous_wave(frequencies, lengths)
+
+    assert len(wave_) == sum(lengths)
+
+    # first note matches the synthesizer, which starts at the same phase
+    first_note = Tone.default().synthesizer.generate_constant_wave(440, 0.02)
+    assert np.allclose(wave_[:len(first_note)], first_note)
+
+    # no jumps at note boundaries: consecutive samples never differ by more than the largest phase step allows
+    max_step = 2 * np.pi * max(frequencies) / SAMPLE_RATE
+    assert np.abs(np.diff(wave_)).max() <= max_step
+
+    pcm = Tone.render_melody(make_melody(), phase_continuous=True)
+    assert len(pcm) == len(Tone.render_melody(make_melody()))
+
+
+def test_write_pcm16_wav(tmp_path, make_melody):
+    pcm = Tone.render_melody(make_melody())
+    file_path = str(tmp_path / 'melody.wav')
+    write_pcm16_wav(file_path, pcm)
+
+    with wave.open(file_path, 'rb') as wav_file:
+        assert wav_file.getframerate() == SAMPLE_RATE
+        assert wav_file.getsampwidth() == 2
+        assert wav_file.getnframes() == len(pcm)
+        assert np.array_equal(np.frombuffer(wav_file.readframes(len(pcm)), dtype=np.int16), pcm)
+
+
+def test_stream_melody_matches_render_melody(make_melody):
+    melody = make_melody()
+    blocks = list(Tone.stream_melody(iter(melody), block_size=1000))
+
+    assert all(len(block) == 1000 for block in blocks[:-1])
+    assert 0 < len(blocks[-1]) <= 1000
+
+    streamed = np.concatenate(blocks).astype(np.int32)
+    rendered = Tone.render_melody(melody).astype(np.int32)
+    assert len(streamed) == len(rendered)
+    assert np.abs(streamed - rendered).max() <= 1
+
+
+def test_open_pcm16_wav_patches_header(tmp_path, make_melody):
+    file_path = str(tmp_path / 'stream.wav')
+
+    blocks = list(Tone.stream_melody(make_melody(), block_size=512))
+    with open_pcm16_wav(file_path) as wav_file:
+        for block in blocks:
+            wav_file.writeframes(block)
+
+    with wave.open(file_path, 'rb') as wav_file:
+        assert wav_file.getnframes() == sum(len(block) for block in blocks)
+
+
+def test_waveform_cache_evicts_least_recently_used():
+    cache = WaveformCache(max_bytes=3 * 8 * 100)
+
+    def generate():
+        return np.zeros(100)
+
+    first = cache.get('a', generate)
+    assert cache.get('a', generate) is first
+    assert not first.flags.writeable
+
+    cache.get('b', generate)
+    cache.get('c', generate)
+    cache.get('a', generate)
+    cache.get('d', generate)
+
+    assert len(cache) == 3
+    assert cache.size_bytes == 3 * 8 * 100
+    assert cache.get('a', generate) is first
+    assert (cache.hits, cache.misses) == (3, 4)
+
+    # 'b' was evicted when 'd' was added
+    cache.get('b', generate)
+    assert cache.misses == 5
+
+    cache.get('large', lambda: np.zeros(1000))
+    assert 'large' not in cache._waves
+
+
+def test_tone_waveform_cache(make_melody):
+    cache = Tone.enable_waveform_cache()
+    try:
+        melody = make_melody() * 3
+        pcm = Tone.render_melody(melody)
+
+        assert cache.misses == 4
+        assert cache.hits == 8
+        assert np.array_equal(pcm, pcm16_from_wave(np.concatenate([Tone.wave_from_note(note) for note in melody])))
+    finally:
+        Tone.disable_waveform_cache()
+
+
+def test_tone_instances(make_melody):
+    assert Tone.default() is Tone.default()
+    assert SquareTone.default() is not Tone.default()
+    assert SquareTone.default().waveform is Waveform.square
+
+    tone = Tone(waveform=Waveform.square, sample_rate=22050)
+    assert tone.waveform is Waveform.square
+    assert Tone.default().waveform is Waveform.sine
+    assert len(tone.render_melody(make_melody())) == sum(num_samples(note.duration.value, 22050) for note in make_melody())
+
+    # the cache of an instance is not shared with the default one
+    tone.enable_waveform_cache()
+    assert Tone.default().waveform_cache is None
+
+
+def test_tones_render_concurrently(make_melody):
+    tones = [Tone(waveform=waveform) for waveform in [Waveform.sine, Waveform.square, Waveform.sawtooth]]
+    for tone in tones:
+        tone.enable_waveform_cache()
+
+    expected = [tone.render_melody(make_melody() * 4) for tone in tones]
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        results = list(executor.map(lambda tone: tone.render_melody(make_melody() * 4), tones * 4))
+
+    for idx, pcm in enumerate(results):
+        assert np.array_equal(pcm, expected[idx % len(tones)])
+
+
+def test_segment_bounds():
+    assert segment_bounds([], 4) == []
+    assert segment_bounds([10] * 8, 4) == [(0, 2), (2, 4), (4, 6), (6, 8)]
+    assert segment_bounds([100, 1, 1, 1, 1], 4) == [(0, 1), (1, 5)]
+    assert segment_bounds([1, 1, 1], 8) == [(0, 1), (1, 2), (2, 3)]
+
+
+def test_render_in_parallel_matches_serial(tmp_path, make_melody):
+    melody = make_melody() * 5 + [440.0, 220]
+    assert np.array_equal(Tone.render_melody(melody, duration=0.1, processes=2),
+                          Tone.render_melody(melody, duration=0.1))
+
+    chords = [[220, 277.18, 329.63], [Pitch('A4'), Pitch('C5')]] * 3
+    assert np.array_equal(SquareTone.render_progression(chords, duration=0.1, processes=2),
+                          SquareTone.render_progression(chords, duration=0.1))
+
+    with pytest.raises(ValueError):
+        Tone.render_melody(melody, phase_continuous=True, processes=2)
+    with pytest.raises(ValueError):
+        Tone.write_wav_melody(str(tmp_path / 'melody.wav'), melody, phase_continuous=True, processes=2)
+
+
+class RecordingPlayer:
+    """
+    Stands in for the audio output of a tone, taking `latency` seconds to play each wave.
+    """
+
+    def __init__(self, latency: float = 0):
+        self.latency = latency
+        self.waves = []
+
+    def play_wave(self, wave_):
+        time.sleep(self.latency)
+        self.waves.append(wave_)
+
+
+def test_play_melody_renders_ahead(make_melody):
+    tone = Tone()
+    tone._player = RecordingPlayer(latency=0.01)
+
+    melody = make_melody() * 3
+    assert tone.play_melody(melody, lookahead=2) == 0
+    assert len(tone._player.waves) == len(melody)
+    for wave_, note in zip(tone._player.waves, melody):
+        assert np.array_equal(wave_, tone.wave_from_note(note))
+
+    assert tone.play_progression([[440, 550], [330, 440]], duration=0.1) == 0
+    assert np.array_equal(tone._player.waves[-1], tone.wave_from_chord([330, 440], 0.1))
+
+
+def test_lookahead_renderer_is_bounded():
+    rendered = []
+    played = []
+
+    def render(sound):
+        rendered.append(sound)
+        return np.zeros(1)
+
+    renderer = LookaheadRenderer(render, range(20), lookahead=3)
+    for _ in renderer:
+        time.sleep(0.005)
+        # the renderer is at most the queue, and one sound being rendered, ahead of the consumer
+        played.append(len(rendered))
+        assert len(rendered) <= len(played) + 3 + 1
+
+    assert rendered == list(range(20))
+    assert renderer.underruns == 0
+
+
+def test_lookahead_renderer_underruns_and_errors():
+    def slow_render(sound):
+        time.sleep(0.01)
+        return np.zeros(1)
+
+    renderer = LookaheadRenderer(slow_render, range(5))
+    assert len(list(renderer)) == 5
+    assert renderer.underruns == 4
+
+    def failing_render(sound):
+        if sound == 3:
+            raise ValueError("can't render")
+        return np.zeros(1)
+
+    with pytest.raises(ValueError):
+        list(LookaheadRenderer(failing_render, range(5)))
+
+    # stopping early stops the renderer
+    renderer = LookaheadRenderer(lambda sound: np.zeros(1), iter(int, 1), lookahead=2)
+    for _ in renderer:
+        break
+    assert not renderer._thread.is_alive()
+
+
+def test_notes_timed_in_ticks_do_not_drift(triplet_melody):
+    ticks = [note.duration.ticks for note in triplet_melody]
+    ends = samples_from_ticks(onset_ticks(ticks) + ticks, 97, NoteValue.QUARTER, SAMPLE_RATE)
+
+    # each note ends at the sample nearest to its exact end (in ticks), however many notes precede it
+    lengths = [length for _, length in notes_with_lengths(triplet_melody)]
+    assert np.array_equal(np.cumsum(lengths), ends)
+    assert sum(num_samples(note.duration.value) for note in triplet_melody) < ends[-1]
+
+    pcm = Tone.render_melody(triplet_melody)
+    assert len(pcm) == ends[-1]
+    assert np.array_equal(pcm[ends[-2]:], pcm16_from_wave(Tone.wave_from_note(triplet_melody[-1], length=lengths[-1])))
+    assert np.array_equal(Tone.render_melody(triplet_melody, processes=2), pcm)
+    assert len(Tone.render_melody(triplet_melody, phase_continuous=True)) == len(pcm)
+    assert sum(len(block) for block in Tone.stream_melody(triplet_melody)) == len(pcm)
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)
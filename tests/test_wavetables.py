@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+import sys
+
+from synthesizer import Oscillator, Waveform
+
+from composer.tone import SawtoothTone, SquareTone, TriangleTone, num_samples
+from composer.wavetables import Wavetable
+
+SAMPLE_RATE = 44100
+
+
+def naive_wave(waveform, frequency, size):
+    phases = np.cumsum(2 * np.pi * frequency / SAMPLE_RATE * np.ones(size))
+    return Oscillator(waveform=waveform, volume=1.0).generate_wave(phases)
+
+
+@pytest.mark.parametrize('waveform', [Waveform.sine, Waveform.triangle])
+def test_wavetable_matches_smooth_waveforms(waveform):
+    wavetable = Wavetable(waveform, SAMPLE_RATE)
+    assert np.abs(wavetable.render(110, 4410) - naive_wave(waveform, 110, 4410)).max() < 1e-2
+
+
+@pytest.mark.parametrize('waveform', [Waveform.sawtooth, Waveform.square, Waveform.triangle])
+def test_wavetable_is_band_limited(waveform):
+    wavetable = Wavetable(waveform, SAMPLE_RATE)
+    frequency = 3150
+
+    wave_ = wavetable.render(frequency, SAMPLE_RATE)
+    assert np.abs(wave_).max() <= 1
+
+    # with a second of audio, spectrum bins are 1Hz apart: everything but harmonics of the note is aliasing
+    spectrum = np.abs(np.fft.rfft(wave_))
+    harmonics = np.arange(len(spectrum)) % frequency == 0
+    assert spectrum[~harmonics].sum() < 1e-3 * spectrum.sum()
+
+    naive_spectrum = np.abs(np.fft.rfft(naive_wave(waveform, frequency, SAMPLE_RATE)))
+    assert naive_spectrum[~harmonics].sum() > spectrum[~harmonics].sum()
+
+    # the shape still follows the waveform
+    assert np.corrcoef(wavetable.render(110, 4410), naive_wave(waveform, 110, 4410))[0, 1] > 0.95
+
+
+def test_wavetable_render_melody_is_phase_continuous():
+    wavetable = Wavetable(Waveform.sawtooth, SAMPLE_RATE)
+    wave_ = wavetable.render_melody([110, 220, 55], [1000, 1000, 1000])
+
+    assert len(wave_) == 3000
+    assert np.allclose(wave_[:1000], wavetable.render(110, 1000))
+
+
+def test_wavetable_tones():
+    for tone in [SawtoothTone, SquareTone, TriangleTone]:
+        wave_ = tone.wave_from_note(220, duration=0.1)
+        assert len(wave_) == num_samples(0.1)
+        assert np.abs(wave_).max() <= 1
+
+        chord = tone.wave_from_chord([220, 330], duration=0.1)
+        assert np.abs(chord).max() <= 1
+
+        assert len(np.concatenate(list(tone.stream_melody([220, 330], duration=0.1)))) == 2 * num_samples(0.1)
+
+
+if __name__ == '__main__':
+    pytest.main(sys.argv)